@@ -4,7 +4,8 @@ Utilities for working with nucleotide and amino acid sequences.
 
 from puzzletools.enumeration import EnumerationMeta
 from puzzletools.code import Code
-from puzzletools.datafiles import load_tsv
+from puzzletools.datafiles import LazyMapping, LazySequence, lazy_class_attribute, load_tsv
+from collections import namedtuple
 import re
 
 def amino_encode(s):
@@ -19,6 +20,131 @@ base_pair={ 'A' : 'T', 'C' : 'G', 'G' : 'C', 'T' : 'A' }
 def _groups_of_three(x):
     return (x[i:i+3] for i in range(0,len(x)-2,3))
 
+# Bases are coded as 2-bit numbers, chosen so that the complement of x is 3-x
+_bases = 'ACGT'
+
+# NumPy and the data tables are loaded on first use, to keep imports fast
+_base_codes = None
+_codon_table = None
+_genetic_code = None
+_amino_acids_extended = None
+_stops = None
+
+def _get_genetic_code():
+    global _genetic_code
+    if _genetic_code is None:
+        _genetic_code = dict(load_tsv('genetic_code.tsv'))
+    return _genetic_code
+
+def _get_amino_acids_extended():
+    global _amino_acids_extended
+    if _amino_acids_extended is None:
+        _amino_acids_extended = AminoAcid.items + load_tsv('amino_extra.tsv', AminoAcid)
+    return _amino_acids_extended
+
+genetic_code = LazyMapping(_get_genetic_code)
+amino_acids_extended = LazySequence(_get_amino_acids_extended)
+
+def _get_base_codes():
+    global _base_codes
+    if _base_codes is None:
+        import numpy as np
+        codes = np.full(0x100, 0xff, dtype=np.uint8)
+        for i, b in enumerate(_bases):
+            codes[ord(b)] = i
+        _base_codes = codes
+    return _base_codes
+
+def _get_codon_table():
+    global _codon_table
+    if _codon_table is None:
+        import numpy as np
+        table = np.zeros(64, dtype=np.uint8)
+        for codon, acid in _get_genetic_code().items():
+            table[sum(_bases.index(b)<<(4-2*i) for i, b in enumerate(codon))] = ord(acid)
+        _codon_table = table
+    return _codon_table
+
+def _translate_codes(codes):
+    import numpy as np
+    n = len(codes)//3
+    c = codes[:3*n].reshape(n,3).astype(np.uint8)
+    return _get_codon_table()[(c[:,0]<<4)|(c[:,1]<<2)|c[:,2]].tobytes().decode('ascii')
+
+def _stop_codons():
+    global _stops
+    if _stops is None:
+        _stops = tuple(codon for codon, acid in _get_genetic_code().items() if acid=='#')
+    return _stops
+
+def _translate(code,start,end):
+    genetic_code = _get_genetic_code()
+    return ''.join(genetic_code[code[i:i+3]] for i in range(start,end-2,3))
+
+def _next_stop(code,start):
+    '''
+    Returns the position of the first stop codon in ``code`` that is in
+    frame with ``start``, or the end of the last whole codon if there is
+    none.
+
+    The stop codons are searched for in a window after ``start`` that
+    doubles in size until a stop is found, so the time taken is roughly
+    proportional to the length of the reading frame rather than to the
+    length of ``code``.
+
+        >>> _next_stop('AAATGACTAAGTAGA', 0)
+        3
+        >>> _next_stop('AAATGACTAAGTAGA', 1)
+        7
+        >>> _next_stop('AAATGACTAAGTAGA', 2)
+        11
+    '''
+    stops = _stop_codons()
+    end = len(code)-(len(code)-start)%3
+    lo = start
+    window = 96
+    while lo<end:
+        hi = min(lo+window,end)
+        # stop codons starting before hi, which lie entirely before end
+        limit = min(hi+2,end)
+        found = hi
+        for stop in stops:
+            i = code.find(stop,lo,limit)
+            while i!=-1 and (i-start)%3:
+                i = code.find(stop,i+1,limit)
+            if i!=-1 and i<found:
+                found = i
+        if found<hi:
+            return found
+        lo = hi
+        window *= 2
+    return end
+
+def _orf_bounds(code):
+    '''
+    Yields the bounds of the coding region following the first start codon
+    after each stop codon in each frame, leaving out the start and stop
+    codons.
+    '''
+    ends = [0,0,0]
+    offset = code.find('ATG')
+    while offset!=-1:
+        frame = offset%3
+        if offset>=ends[frame]:
+            end = _next_stop(code,offset+3)
+            ends[frame] = end
+            yield (offset+3,end)
+        offset = code.find('ATG',offset+1)
+
+ORF = namedtuple('ORF', ['strand', 'frame', 'start', 'end', 'protein'])
+ORF.__doc__ = '''
+An open reading frame.  ``strand`` is 1 for the sequence itself and -1 for
+its conjugate, and ``frame`` is the offset (0, 1, or 2) of the first codon
+within that strand.  ``start`` and ``end`` are the positions of the ORF
+(including its stop codon) in the original sequence, in slice notation.
+``protein`` is the translation, starting with Met and excluding the stop.
+'''
+
 class NucleotideSequence:
     '''
     A sequence of nucleotides.
@@ -57,6 +183,61 @@ class NucleotideSequence:
     def rna_string(self):
         return self.nucleotides.replace('T','U')
 
+    def base_codes(self):
+        '''
+        Returns the sequence as a NumPy array of 2-bit base codes, with
+        A, C, G, T represented by 0, 1, 2, 3.
+        '''
+        import numpy as np
+        codes = _get_base_codes()[np.frombuffer(self.nucleotides.encode('latin-1'), dtype=np.uint8)]
+        if (codes==0xff).any():
+            raise ValueError('Sequence contains characters other than A, C, G, T, U')
+        return codes
+
+    def six_frame_translate(self):
+        '''
+        Translates all three reading frames of this sequence and of its
+        conjugate.  Stop codons are translated as ``#``.
+
+            >>> [str(a) for a in NucleotideSequence('GATATCGCA').six_frame_translate()]
+            ['DIA', 'IS', 'YR', 'CDI', 'AI', 'RY']
+        '''
+        fwd = self.base_codes()
+        rev = 3-fwd[::-1]
+        return [AminoSequence(_translate_codes(codes[f:])) for codes in (fwd, rev) for f in range(3)]
+
+    def find_orfs(self, min_length=1):
+        '''
+        Finds the open reading frames in all six frames.  Each ORF starts at
+        the first start codon following the previous in-frame stop codon
+        and ends with a stop codon.  Only ORFs encoding at least
+        ``min_length`` amino acids are returned.
+
+            >>> NucleotideSequence('CCATGGCCTAAGTTACATGTT').find_orfs()
+            [ORF(strand=1, frame=2, start=2, end=11, protein=AminoSequence('MA')), ORF(strand=-1, frame=0, start=12, end=18, protein=AminoSequence('M'))]
+        '''
+        import numpy as np
+        fwd = self.base_codes()
+        n = len(fwd)
+        orfs = []
+        for strand, codes in ((1, fwd), (-1, 3-fwd[::-1])):
+            for frame in range(3):
+                protein = _translate_codes(codes[frame:])
+                acids = np.frombuffer(protein.encode('ascii'), dtype=np.uint8)
+                stops = np.flatnonzero(acids==ord('#'))
+                starts = np.flatnonzero(acids==ord('M'))
+                # the first start codon after each stop codon
+                idx = np.searchsorted(starts, np.concatenate(([0], stops[:-1]+1)))
+                for stop, i in zip(stops, idx):
+                    if i<len(starts) and starts[i]<stop and stop-starts[i]>=min_length:
+                        begin = frame+3*starts[i]
+                        end = frame+3*stop+3
+                        if strand==-1:
+                            begin, end = n-end, n-begin
+                        orfs.append(ORF(strand, frame, int(begin), int(end),
+                            AminoSequence(protein[starts[i]:stop])))
+        return orfs
+
     def dna_string(self):
         return self.nucleotides
 
@@ -68,23 +249,43 @@ class NucleotideSequence:
         'keep' - Codes from the beginning to the string to the end of the string.
         'chop' - Codes from the beginning of the string to the end of the string.  Will discard a single leading Met and arbitrarily many trailing stop codons.
         'search' - Starts coding when it finds a start codon.  Stops if it encounters a stop codon.
+        'longest' - Like 'search', but uses the start codon that gives the longest result.
+        'all' - Returns a list, containing the result of 'search' for the first start codon after each stop codon, in each frame.
+
+        Codons after the stop codon are never translated.
+
+            >>> n = NucleotideSequence('ATGAAATGACCCATGTTTGGGTAG')
+            >>> n.to_amino('search')
+            AminoSequence('K')
+            >>> n.to_amino('longest')
+            AminoSequence('THVWV')
+            >>> n.to_amino('all')
+            [AminoSequence('K'), AminoSequence('THVWV'), AminoSequence('FG')]
+            >>> NucleotideSequence('ATGAAATGACTAAGTAGAA').to_amino('search')
+            AminoSequence('K')
         """
-        if start_behavior!='keep' and start_behavior!='chop' and start_behavior!='search':
-            raise ValueError('Unrecognized start behavior.  Allowed behaviors are keep, chop, search.')
+        if start_behavior not in ('keep','chop','search','longest','all'):
+            raise ValueError('Unrecognized start behavior.  Allowed behaviors are keep, chop, search, longest, all.')
         code = self.nucleotides
-        if(start_behavior=='search'):
+        if start_behavior=='keep' or start_behavior=='chop':
+            sequence = _translate(code,0,len(code))
+            if start_behavior=='chop':
+                if sequence.startswith('M'):
+                    sequence = sequence[1:]
+                sequence = sequence.rstrip('#')
+            return AminoSequence(sequence)
+        if start_behavior=='search':
             offset = code.find('ATG')
-            if offset!=-1:
-                code = code[offset+3:]
-            else:
-                code = ''
-        sequence = ''.join(genetic_code[i] for i in _groups_of_three(code))
-        if(start_behavior=='search'):
-            sequence = re.sub('#.*','',sequence)
-        elif(start_behavior=='chop'):
-            sequence = re.sub('^M','',sequence)
-            sequence = re.sub('#*$','',sequence)
-        return AminoSequence(sequence)
+            if offset==-1:
+                return AminoSequence('')
+            return AminoSequence(_translate(code,offset+3,_next_stop(code,offset+3)))
+        orfs = list(_orf_bounds(code))
+        if start_behavior=='all':
+            return [AminoSequence(_translate(code,b,e)) for b,e in orfs]
+        if not orfs:
+            return AminoSequence('')
+        b,e = max(orfs,key=lambda orf: orf[1]-orf[0])
+        return AminoSequence(_translate(code,b,e))
 
     def __getitem__(self, index):
         return NucleotideSequence(self.nucleotides[index])
@@ -95,14 +296,105 @@ class NucleotideSequence:
     def __repr__(self):
         return "NucleotideSequence(%s)"%repr(self.nucleotides)
 
+_shifts = (6,4,2,0)
+
+def _pack(codes):
+    import numpy as np
+    padded = np.zeros(-(-len(codes)//4)*4, dtype=np.uint8)
+    padded[:len(codes)] = codes
+    return (padded.reshape(-1,4)<<np.array(_shifts, dtype=np.uint8)).sum(axis=1, dtype=np.uint8)
+
+class PackedNucleotideSequence(NucleotideSequence):
+    '''
+    A sequence of nucleotides stored with two bits per base.  Slices with
+    step 1 share memory with the original sequence, and the string form is
+    only built when it is needed.  Only A, C, G, T (or U) are allowed.
+
+        >>> p = PackedNucleotideSequence('GATATCGCA')
+        >>> p[2:8]
+        PackedNucleotideSequence('TATCGC')
+        >>> p[2:8].conjugate()
+        PackedNucleotideSequence('GCGATA')
+        >>> p.to_amino()
+        AminoSequence('DIA')
+        >>> p[-1], p[2:8][1]
+        (PackedNucleotideSequence('A'), PackedNucleotideSequence('A'))
+        >>> p[9]
+        Traceback (most recent call last):
+        ...
+        IndexError: sequence index out of range
+    '''
+
+    def __init__(self, seq):
+        if isinstance(seq, PackedNucleotideSequence):
+            self.packed = seq.packed
+            self.start = seq.start
+            self.length = seq.length
+        else:
+            codes = NucleotideSequence(seq).base_codes()
+            self.packed = _pack(codes)
+            self.start = 0
+            self.length = len(codes)
+
+    @classmethod
+    def _from_codes(cls, codes):
+        seq = cls.__new__(cls)
+        seq.packed = _pack(codes)
+        seq.start = 0
+        seq.length = len(codes)
+        return seq
+
+    @property
+    def nucleotides(self):
+        import numpy as np
+        letters = np.frombuffer(_bases.encode('ascii'), dtype=np.uint8)
+        return letters[self.base_codes()].tobytes().decode('ascii')
+
+    def base_codes(self):
+        import numpy as np
+        first = self.start//4
+        last = -(-(self.start+self.length)//4)
+        codes = ((self.packed[first:last,None]>>np.array(_shifts, dtype=np.uint8))&3).reshape(-1)
+        offset = self.start-4*first
+        return codes[offset:offset+self.length]
+
+    def conjugate(self):
+        return self._from_codes(3-self.base_codes()[::-1])
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.length)
+            if step==1:
+                seq = type(self)(self)
+                seq.start = self.start+start
+                seq.length = max(stop-start, 0)
+                return seq
+            return self._from_codes(self.base_codes()[index])
+        import numpy as np
+        if index<0:
+            index += self.length
+        if not 0<=index<self.length:
+            raise IndexError('sequence index out of range')
+        # read the one base directly, without unpacking the rest
+        pos = self.start+index
+        seq = type(self).__new__(type(self))
+        seq.packed = np.array([self.packed[pos//4]<<2*(pos%4)&0xc0], dtype=np.uint8)
+        seq.start = 0
+        seq.length = 1
+        return seq
+
+    def __repr__(self):
+        return "PackedNucleotideSequence(%s)"%repr(self.nucleotides)
+
 class AminoAcid(metaclass=EnumerationMeta):
     letter: str
     abbr: str
     name: str
 
-AminoAcid.items = load_tsv('amino.tsv', AminoAcid)
-
-amino_acids_extended = AminoAcid.items + load_tsv('amino_extra.tsv', AminoAcid)
+AminoAcid.set_items_lazy(lambda: load_tsv('amino.tsv', AminoAcid))
 
 class AminoSequence(object):
     '''
@@ -115,8 +407,13 @@ class AminoSequence(object):
         AminoSequence('ASDF')
     '''
 
-    one_to_three = { v.letter : v.abbr.upper() for v in amino_acids_extended }
-    three_to_one = { v.abbr.upper() : v.letter for v in amino_acids_extended }
+    @lazy_class_attribute
+    def one_to_three(cls):
+        return { v.letter : v.abbr.upper() for v in _get_amino_acids_extended() }
+
+    @lazy_class_attribute
+    def three_to_one(cls):
+        return { v.abbr.upper() : v.letter for v in _get_amino_acids_extended() }
 
     def __init__(self, seq):
         '''
@@ -152,7 +449,14 @@ class AminoSequence(object):
 
 class Amino(Code):
 
-    to_parent=AminoSequence.three_to_one.__getitem__
-    from_parent=AminoSequence.one_to_three.__getitem__
+    @staticmethod
+    def domain():
+        return AminoSequence.three_to_one.keys()
 
-genetic_code = dict(load_tsv('genetic_code.tsv'))
+    @staticmethod
+    def to_parent(data):
+        return AminoSequence.three_to_one[data]
+
+    @staticmethod
+    def from_parent(data):
+        return AminoSequence.one_to_three[data]
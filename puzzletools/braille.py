@@ -33,6 +33,11 @@ where stars represent raised dots.  Since dots
     >>> grid[0][2] = None
     >>> [braille_possible_letters(*braille_list_to_binary_mask(l)) for l in braille_divide_grid(grid)]
     [['A'], ['P', 'S']]
+
+Large grids can be decoded all at once with NumPy:
+
+    >>> braille_grid_letters(grid)
+    array([[('A',), ('P', 'S')]], dtype=object)
 '''
 
 from puzzletools.code import Code
@@ -42,6 +47,10 @@ braille_binary = [ord(ch)-0x2800 for ch in braille_alphabet]
 
 class BrailleBinary(Code):
 
+    @staticmethod
+    def domain():
+        return range(0x100)
+
     @staticmethod
     def validate(data):
         if data<0 or data>=0x100:
@@ -63,6 +72,10 @@ class BrailleUnicode(Code):
     parent = BrailleBinary
     list_constructor = ''.join
 
+    @staticmethod
+    def domain():
+        return [chr(0x2800+i) for i in range(0x100)]
+
     @staticmethod
     def from_parent(data):
         return chr(0x2800+data)
@@ -85,16 +98,50 @@ class BrailleList(Code):
     def from_parent(code):
         return [(code>>i)&1 for i in range(6)]
 
-def braille_possible_letters(code,mask):
+def braille_dots_to_binary(dots):
+    '''
+    Converts a string of dot numbers, such as ``'1456'``, to the binary
+    representation of a Braille cell.
+
+        >>> braille_dots_to_binary('1456')
+        57
+    '''
+    return sum(1<<(int(d)-1) for d in set(dots))
+
+_possible_letters_index = {}
+
+def _braille_index(kinds):
+    index = _possible_letters_index.get(kinds)
+    if index is None:
+        from puzzletools.braille_symbols import BrailleSymbol
+        symbols = [(s.symbol, s.binary()) for s in BrailleSymbol if s.kind in kinds]
+        index = [None]*0x10000
+        for mask in range(0x100):
+            groups = {}
+            for sym, b in symbols:
+                groups.setdefault(b&mask, []).append(sym)
+            groups = { k : tuple(v) for k, v in groups.items() }
+            for code in range(0x100):
+                index[code<<8|mask] = groups.get(code&mask, ())
+        _possible_letters_index[kinds] = index
+    return index
+
+def braille_possible_letters(code,mask,kinds=('letter',)):
     '''
     Returns the possible letters for a Braille block for which we have partial
-    knowledge.
+    knowledge.  The answers are precomputed, so each query takes constant
+    time.
 
     Parameters:
     code - the binary representation of the dots that are known to be raised
     mask - the binary representation of the dots that are known
+    kinds - the kinds of symbols to consider: any of 'letter', 'digit',
+    'punctuation', and 'contraction' (Grade 2 groupsigns)
+
+        >>> braille_possible_letters(0b000011, 0b001011, ('letter','digit','contraction'))
+        ['B', 'H', 'L', 'R', 'V', '2', '8', 'OF', 'GH', 'OU']
     '''
-    return [BrailleBinary.to_parent(i) for i in braille_binary if i&mask==code&mask]
+    return list(_braille_index(tuple(kinds))[(code&0xff)<<8|(mask&0xff)])
 
 def braille_divide_grid(grid):
     '''
@@ -112,3 +159,60 @@ def braille_list_to_binary_mask(l):
     of a dot, and None represents uncertainty.
     '''
     return (BrailleList.to_parent(l),sum((l[i] is not None)<<i for i in range(6)))
+
+def braille_grid_codes(grid, unknown=None, dots=6):
+    '''
+    Converts a grid into arrays of binary Braille codes and masks, one entry
+    per block, in a single vectorized pass.  The grid should be a 2D array
+    (or list of rows) whose height is a multiple of 3 (4 if ``dots`` is 8)
+    and whose width is even.  Entries may be ``None`` to indicate
+    uncertainty; alternatively, ``unknown`` can be a boolean array of the
+    same shape that is true for the uncertain entries.
+
+    Returns a pair ``(codes, masks)`` of ``uint8`` arrays, in the format
+    used by ``braille_possible_letters``.
+    '''
+    import numpy as np
+    if dots!=6 and dots!=8:
+        raise ValueError("Braille blocks must have 6 or 8 dots")
+    height = dots//2
+    a = np.asarray(grid)
+    if a.dtype==object:
+        unk = np.equal(a, None)
+        a = np.where(unk, False, a).astype(bool)
+    else:
+        unk = np.zeros(a.shape, dtype=bool)
+        a = a.astype(bool)
+    if unknown is not None:
+        unk |= np.asarray(unknown, dtype=bool)
+    rows, cols = a.shape
+    if rows%height or cols%2:
+        raise ValueError("Grid size is not a multiple of the block size")
+    shape = (rows//height, height, cols//2, 2)
+    weights = np.array([[1,8],[2,16],[4,32],[64,128]], dtype=np.uint8)[None,:height,None,:]
+    known = ~unk.reshape(shape)
+    codes = np.where(a.reshape(shape) & known, weights, 0)
+    masks = np.where(known, weights, 0)
+    return (codes.sum(axis=(1,3), dtype=np.uint8), masks.sum(axis=(1,3), dtype=np.uint8))
+
+_letter_tables = {}
+
+def _braille_letter_table(kinds):
+    table = _letter_tables.get(kinds)
+    if table is None:
+        import numpy as np
+        table = np.empty(0x10000, dtype=object)
+        for i, letters in enumerate(_braille_index(kinds)):
+            table[i] = letters
+        table = _letter_tables[kinds] = table.reshape(0x100,0x100)
+    return table
+
+def braille_grid_letters(grid, unknown=None, dots=6, kinds=('letter',)):
+    '''
+    Returns a 2D array containing the tuple of possible letters for each
+    block of ``grid``.  The arguments are the same as for
+    ``braille_grid_codes``, and ``kinds`` is as in
+    ``braille_possible_letters``.
+    '''
+    codes, masks = braille_grid_codes(grid, unknown, dots)
+    return _braille_letter_table(tuple(kinds))[codes, masks]
@@ -0,0 +1,230 @@
+'''
+Decoder for Grade 2 (contracted) English Braille.
+
+In contracted Braille, a cell can stand for a letter, a group of letters,
+a whole word, or a punctuation mark, depending on where it appears in the
+word.  The decoder builds a lattice of all the readings that are allowed
+by the contraction rules and picks the best path through it, optionally
+using a wordlist to break ties.
+
+    >>> dec = Grade2Decoder()
+    >>> dec('⠠⠮ ⠡ ⠴ ⠐⠓⠲')
+    'The child was here.'
+    >>> dec('⠼⠁⠃ ⠋⠗⠊⠢⠙⠎⠖')
+    '12 friends!'
+    >>> dec.readings('⠆')
+    [(1.0, 'be'), (1.5, ';')]
+    >>> dec.decode_word('⠁⠃')
+    'about'
+    >>> Grade2Decoder(['ab', 'abs']).decode_word('⠁⠃')
+    'ab'
+
+The rule table is in ``data/braille_grade2.tsv``.  It covers the
+alphabetic and strong wordsigns, groupsigns, lower signs, initial-letter
+and final-letter contractions, some common short-form words, and
+punctuation.
+'''
+
+from bisect import bisect_left
+from puzzletools.braille import braille_dots_to_binary
+from puzzletools.braille_symbols import BrailleSymbol
+from puzzletools.datafiles import load_tsv
+from puzzletools.enumeration import EnumerationMeta
+import math, re
+
+class Grade2Rule(metaclass=EnumerationMeta):
+    text: str
+    cells: str
+    context: str
+
+Grade2Rule.set_items_lazy(lambda: load_tsv('braille_grade2.tsv', Grade2Rule))
+
+_capital_sign = braille_dots_to_binary('6')
+_letter_sign = braille_dots_to_binary('56')
+_number_sign = braille_dots_to_binary('3456')
+
+_tables = None
+
+def _compile_tables():
+    digits = { s.binary() : s.symbol for s in BrailleSymbol if s.kind=='digit' }
+    # Cells that may come before the first letter of a word, or after the last one
+    leading = { _capital_sign, _letter_sign, _number_sign } | { braille_dots_to_binary(r.cells)
+        for r in Grade2Rule if r.context=='leading' }
+    trailing = { braille_dots_to_binary(r.cells) for r in Grade2Rule if r.context=='trailing' }
+    # Letters that have a wordsign can only mean the letter when part of a word
+    wordsign_cells = { r.cells for r in Grade2Rule if r.context=='word' }
+    rules = {}
+    def add(text, cells, context):
+        rules.setdefault(cells[0], []).append((tuple(cells), text, context))
+    for s in BrailleSymbol:
+        if s.kind=='letter':
+            context = 'part' if s.dots in wordsign_cells and s.symbol not in 'AIO' else 'any'
+            add(s.symbol.lower(), [s.binary()], context)
+            add(s.symbol.lower(), [_letter_sign, s.binary()], 'any')
+    for r in Grade2Rule:
+        add(r.text, [braille_dots_to_binary(c) for c in r.cells.split(' ')], r.context)
+    return (digits, leading, trailing, rules)
+
+def _get_tables():
+    global _tables
+    if _tables is None:
+        _tables = _compile_tables()
+    return _tables
+
+_nonalpha_re = re.compile('[^A-Z]')
+
+def _boundaries(cells, leading, trailing):
+    n = len(cells)
+    can_start = [True]*(n+1)
+    for i in range(n):
+        can_start[i+1] = can_start[i] and cells[i] in leading
+    can_end = [True]*(n+1)
+    for i in range(n-1, -1, -1):
+        can_end[i] = can_end[i+1] and cells[i] in trailing
+    return (can_start, can_end)
+
+def _context_ok(context, i, j, can_start, can_end):
+    if context=='any':
+        return True
+    if context=='word':
+        return can_start[i] and can_end[j]
+    if context=='part':
+        return not (can_start[i] and can_end[j])
+    if context=='initial':
+        return can_start[i] and not can_end[j]
+    if context=='medial':
+        return not can_start[i] and not can_end[j]
+    if context=='noninitial':
+        return not can_start[i]
+    if context=='leading':
+        return can_start[j]
+    if context=='trailing':
+        return can_end[i]
+    raise ValueError('Unknown rule context %r' % context)
+
+def _capitalize(text, caps):
+    if caps==2:
+        return (text.upper(), 2)
+    if caps==1:
+        for k, c in enumerate(text):
+            if c.isalpha():
+                return (text[:k]+c.upper()+text[k+1:], 0)
+    return (text, caps)
+
+def _to_cells(data):
+    if isinstance(data, str):
+        return [0 if c.isspace() else ord(c)-0x2800 for c in data]
+    return list(data)
+
+class Grade2Decoder:
+    '''
+    Decodes Grade 2 Braille.  Input may be a string of Unicode Braille
+    characters (with spaces or blank cells between words) or a sequence of
+    binary cells (with 0 between words).
+
+    Keyword arguments:
+    ``wordlist`` - Optional.  Either a mapping from words to frequencies or
+    an iterable of words.  Readings that are words in the list are preferred.
+    ``beam`` - The number of partial readings to keep for each position and
+    state.  The running time is linear in the length of the input and in
+    ``beam``.
+    '''
+
+    # cost of a reading whose letters are not a word in the wordlist
+    nonword_penalty = 10.0
+    # punctuation is slightly less likely than a contraction for the same cell
+    punctuation_cost = 1.5
+
+    def __init__(self, wordlist=None, beam=8):
+        self.beam = beam
+        if wordlist is None:
+            self.words = None
+        else:
+            if not hasattr(wordlist, 'items'):
+                wordlist = dict.fromkeys(wordlist, 1)
+            total = sum(wordlist.values())
+            self.words = { _nonalpha_re.sub('', w.upper()) : -math.log(f/total)
+                for w, f in wordlist.items() if f>0 }
+            self.prefixes = sorted(self.words)
+
+    def _is_prefix(self, text):
+        key = _nonalpha_re.sub('', text.upper())
+        idx = bisect_left(self.prefixes, key)
+        return idx<len(self.prefixes) and self.prefixes[idx].startswith(key)
+
+    def readings(self, cells, top=5):
+        '''
+        Returns the ``top`` best readings of a single word, as a list of
+        ``(cost, text)`` pairs with the lowest cost first.
+        '''
+        digits, leading, trailing, rules = _get_tables()
+        cells = _to_cells(cells)
+        n = len(cells)
+        can_start, can_end = _boundaries(cells, leading, trailing)
+        # lattice[i] maps (numeric, caps) states to the best partial readings
+        # (cost, text, in_wordlist) of the first i cells
+        lattice = [{} for _ in range(n+1)]
+        lattice[0][(False, 0)] = [(0.0, '', True)]
+        for i in range(n):
+            cell = cells[i]
+            for (numeric, caps), hyps in lattice[i].items():
+                hyps = sorted(hyps)[:self.beam]
+                edges = []
+                if cell==_capital_sign:
+                    edges.append((1, 1, '', numeric, 2 if caps==1 else 1))
+                if cell==_number_sign and can_start[i]:
+                    edges.append((1, 1, '', True, caps))
+                if numeric and cell in digits:
+                    edges.append((1, 1, digits[cell], True, caps))
+                for rule_cells, text, context in rules.get(cell, ()):
+                    j = i+len(rule_cells)
+                    if tuple(cells[i:j])!=rule_cells:
+                        continue
+                    # after a number sign, a-j are digits unless there is a letter sign
+                    if numeric and cell in digits:
+                        continue
+                    if _context_ok(context, i, j, can_start, can_end):
+                        weight = self.punctuation_cost if context in ('leading','trailing') else 1
+                        edges.append((len(rule_cells), weight, text, False, caps))
+                for length, weight, text, numeric2, caps2 in edges:
+                    text, caps2 = _capitalize(text, caps2)
+                    nexthyps = lattice[i+length].setdefault((numeric2, caps2), [])
+                    for cost, prev, valid in hyps:
+                        new = prev+text
+                        cost += weight
+                        if valid and self.words is not None and not self._is_prefix(new):
+                            valid = False
+                            cost += self.nonword_penalty
+                        nexthyps.append((cost, new, valid))
+        results = {}
+        for hyps in lattice[n].values():
+            for cost, text, valid in hyps:
+                if self.words is not None:
+                    key = _nonalpha_re.sub('', text.upper())
+                    if key in self.words:
+                        cost += self.words[key]
+                    elif valid:
+                        cost += self.nonword_penalty
+                if text not in results or cost<results[text]:
+                    results[text] = cost
+        return sorted((cost, text) for text, cost in results.items())[:top]
+
+    def decode_word(self, cells):
+        '''
+        Returns the best reading of a single word, or ``None`` if the cells
+        cannot be read.
+        '''
+        r = self.readings(cells, 1)
+        return r[0][1] if r else None
+
+    def __call__(self, data):
+        words = []
+        word = []
+        for cell in _to_cells(data)+[0]:
+            if cell==0:
+                if word:
+                    words.append(self.decode_word(word))
+                    word = []
+            else:
+                word.append(cell)
+        return ' '.join('?' if w is None else w for w in words)
@@ -0,0 +1,30 @@
+'''
+The table of Braille symbols: the letters, and the digits, punctuation,
+and Grade 2 groupsigns listed in ``braille_extra.tsv``.  This is kept
+separate from ``puzzletools.braille`` so that importing that module does
+not require attrs.
+
+    >>> BrailleSymbol.by('symbol')['D'].binary()
+    25
+'''
+
+from puzzletools.braille import braille_binary, braille_dots_to_binary
+from puzzletools.datafiles import load_tsv
+from puzzletools.enumeration import EnumerationMeta
+
+class BrailleSymbol(metaclass=EnumerationMeta):
+    symbol: str
+    dots: str
+    kind: str
+
+    def binary(self):
+        '''
+        Returns the binary representation of this symbol's Braille cell.
+        '''
+        return braille_dots_to_binary(self.dots)
+
+def _load_braille_symbols():
+    return [BrailleSymbol(chr(0x41+i), ''.join(str(d+1) for d in range(6) if b>>d&1), 'letter')
+        for i, b in enumerate(braille_binary)] + load_tsv('braille_extra.tsv', BrailleSymbol)
+
+BrailleSymbol.set_items_lazy(_load_braille_symbols)
@@ -0,0 +1,204 @@
+"""
+A persistent on-disk cache for data that is downloaded from the web, so
+that it only needs to be fetched once rather than once per process.  See
+``EnumerationMeta.set_items_lazy`` for how enumerations use it.
+
+Each entry is a pickle file in the cache directory, holding a metadata
+record followed by the data.  The metadata records when the data was
+fetched and a schema tag; an entry whose schema tag does not match the
+caller's is treated as missing, so changing the fields of a class
+invalidates its cached items.
+
+Settings:
+``cache_dir`` - the cache directory.  Defaults to the ``PUZZLETOOLS_CACHE_DIR``
+environment variable, or ``~/.cache/puzzletools``.
+``offline`` - if true, stale entries are used instead of being refreshed,
+and a missing entry raises ``OfflineError``.  Defaults to true if the
+``PUZZLETOOLS_OFFLINE`` environment variable is set to a nonempty value.
+``default_ttl`` - how long (in seconds) an entry stays fresh, if the caller
+does not say otherwise.
+
+Only the time at which an entry was fetched is recorded, so a stale entry
+is always fetched again in full; there is no revalidation with an HTTP
+validator such as an ETag.
+
+    >>> import tempfile, time
+    >>> from urllib.error import URLError
+    >>> from puzzletools import cache
+    >>> saved = cache.cache_dir, cache.offline
+    >>> tmp = tempfile.TemporaryDirectory()
+    >>> cache.cache_dir = tmp.name
+    >>> calls = []
+    >>> def fetch():
+    ...     calls.append(1)
+    ...     return [len(calls)]
+    >>> cache.cached('numbers', fetch, schema=1, ttl=60)
+    [1]
+    >>> cache.cached('numbers', fetch, schema=1, ttl=60)
+    [1]
+    >>> cache.info('numbers')['schema']
+    1
+
+An entry with a different schema, or one older than ``ttl``, is a miss:
+
+    >>> cache.load('numbers', schema=2) is None
+    True
+    >>> time.sleep(0.01)
+    >>> cache.load('numbers', schema=1, ttl=0) is None
+    True
+    >>> cache.cached('numbers', fetch, schema=1, ttl=0)
+    [2]
+
+In offline mode, stale entries are used, and missing ones are errors:
+
+    >>> cache.offline = True
+    >>> time.sleep(0.01)
+    >>> cache.cached('numbers', fetch, schema=1, ttl=0)
+    [2]
+    >>> cache.cached('letters', fetch)
+    Traceback (most recent call last):
+        ...
+    puzzletools.cache.OfflineError: letters is not cached, and offline mode is on
+    >>> cache.offline = False
+
+If fetching fails with a network error, a stale entry is used instead:
+
+    >>> def unreachable():
+    ...     raise URLError('no network')
+    >>> time.sleep(0.01)
+    >>> cache.cached('numbers', unreachable, schema=1, ttl=0)
+    [2]
+    >>> cache.cached('letters', unreachable)
+    Traceback (most recent call last):
+        ...
+    urllib.error.URLError: <urlopen error no network>
+
+Entries can be removed individually or all at once.  Enumerations whose
+items are cached can remove their own entry:
+
+    >>> cache.store('letters', 'abc')
+    >>> cache.invalidate('numbers')
+    >>> cache.info('numbers') is None, cache.load('letters')
+    (True, 'abc')
+    >>> cache.clear()
+    >>> cache.load('letters') is None
+    True
+    >>> from puzzletools.enumeration import EnumerationMeta
+    >>> class Planet(metaclass=EnumerationMeta):
+    ...     name: str
+    >>> loads = []
+    >>> def load_planets():
+    ...     loads.append(1)
+    ...     return [Planet('Mercury'), Planet('Venus')]
+    >>> Planet.set_items_lazy(load_planets, cache=True)
+    >>> len(Planet), len(loads), cache.info(Planet._cache_key()) is not None
+    (2, 1, True)
+    >>> Planet.invalidate_cache()
+    >>> cache.info(Planet._cache_key()) is None
+    True
+    >>> len(Planet), len(loads)
+    (2, 2)
+    >>> cache.cache_dir, cache.offline = saved
+    >>> tmp.cleanup()
+"""
+
+import os, pickle, time
+from urllib.error import URLError
+
+cache_dir = os.environ.get('PUZZLETOOLS_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.cache', 'puzzletools')
+offline = bool(os.environ.get('PUZZLETOOLS_OFFLINE'))
+default_ttl = 30*24*60*60
+
+class OfflineError(Exception):
+    """
+    Raised when data needs to be downloaded but offline mode is on.
+    """
+
+def _path(key):
+    return os.path.join(cache_dir, key+'.pickle')
+
+def info(key):
+    """
+    Returns the metadata for the entry ``key``, or ``None`` if there is no
+    such entry.
+    """
+    try:
+        with open(_path(key), 'rb') as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+
+def load(key, schema=None, ttl=None, stale=False):
+    """
+    Returns the data stored under ``key``, or ``None`` if there is no entry
+    with a matching schema, or if the entry is older than ``ttl`` seconds
+    (unless ``stale`` is true or offline mode is on).  If ``ttl`` is
+    ``None``, ``default_ttl`` is used.
+    """
+    if ttl is None:
+        ttl = default_ttl
+    try:
+        with open(_path(key), 'rb') as f:
+            meta = pickle.load(f)
+            if meta.get('schema')!=schema:
+                return None
+            if not (stale or offline) and time.time()-meta['fetched']>ttl:
+                return None
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+
+def store(key, data, schema=None):
+    """
+    Stores ``data`` under ``key``.  The file is written atomically, so
+    concurrent processes never see a partial entry.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _path(key)
+    tmp = '%s.%d.tmp' % (path, os.getpid())
+    with open(tmp, 'wb') as f:
+        pickle.dump({ 'fetched': time.time(), 'schema': schema }, f, pickle.HIGHEST_PROTOCOL)
+        pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+def invalidate(key):
+    """
+    Removes the entry ``key`` from the cache, if it exists.
+    """
+    try:
+        os.remove(_path(key))
+    except FileNotFoundError:
+        pass
+
+def clear():
+    """
+    Removes every entry from the cache.
+    """
+    try:
+        names = os.listdir(cache_dir)
+    except FileNotFoundError:
+        return
+    for name in names:
+        if name.endswith('.pickle'):
+            os.remove(os.path.join(cache_dir, name))
+
+def cached(key, fn, schema=None, ttl=None):
+    """
+    Returns the data stored under ``key`` if it is fresh.  Otherwise, calls
+    ``fn`` to compute the data and stores the result.  If ``fn`` fails
+    with a network error, stale data is returned if there is any.
+    """
+    data = load(key, schema, ttl)
+    if data is not None:
+        return data
+    if offline:
+        raise OfflineError('%s is not cached, and offline mode is on' % key)
+    try:
+        data = fn()
+    except URLError:
+        data = load(key, schema, stale=True)
+        if data is None:
+            raise
+        return data
+    store(key, data, schema)
+    return data
@@ -1,4 +1,5 @@
 import abc
+from collections.abc import Hashable
 
 class Code(metaclass=abc.ABCMeta):
 
@@ -16,6 +17,16 @@ class Code(metaclass=abc.ABCMeta):
 
     list_constructor = list
 
+    @classmethod
+    def domain(cls):
+        """
+        Returns an iterable of every valid value of this code, or ``None``
+        if the set of valid values is too large to enumerate.  Converters
+        starting from a code with a finite domain are compiled into a
+        lookup table.
+        """
+        return None
+
     @staticmethod
     @abc.abstractmethod
     def to_parent(self):
@@ -40,7 +51,26 @@ class Alphabet(Code):
 
 Code.parent = Alphabet
 
+_conversion_errors = (LookupError, ValueError, TypeError, AttributeError)
+
+_converter_cache = {}
+
 class CodeConverter:
+    """
+    Converts values from one code to another by way of their closest common
+    ancestor.
+
+    If ``from_code`` (or one of its ancestors along the way) has a finite
+    domain, the rest of the conversion chain is precompiled into a
+    dictionary, so that converting a value takes a single lookup.
+
+        >>> from puzzletools.braille import BrailleUnicode
+        >>> conv = CodeConverter.cached(BrailleUnicode,Alphabet)
+        >>> conv('\u2819')
+        'D'
+        >>> conv is CodeConverter.cached(BrailleUnicode,Alphabet)
+        True
+    """
 
     @staticmethod
     def _find_ancestors(from_anc,to_anc):
@@ -61,9 +91,57 @@ class CodeConverter:
         self.from_code = from_code
         self.to_code = to_code
         self.converters = from_conv + to_conv
+        self._compile(from_anc[:fpos])
+
+    @classmethod
+    def cached(cls,from_code,to_code):
+        """
+        Returns a converter from ``from_code`` to ``to_code``, reusing the
+        one built by a previous call with the same arguments.
+        """
+        key = (from_code,to_code)
+        conv = _converter_cache.get(key)
+        if conv is None:
+            conv = _converter_cache[key] = cls(from_code,to_code)
+        return conv
+
+    def _compile(self,from_anc):
+        self.head = []
+        self.tail = self.converters
+        self.table = None
+        for pos,code in enumerate(from_anc):
+            dom = code.domain()
+            if dom is not None:
+                break
+        else:
+            return
+        tail = self.converters[pos:]
+        table = {}
+        for value in dom:
+            try:
+                result = value
+                for conv in tail:
+                    result = conv(result)
+            except _conversion_errors:
+                continue
+            # mutable results can't safely be shared between calls
+            if not isinstance(result, Hashable):
+                return
+            table[value] = result
+        self.head = self.converters[:pos]
+        self.tail = tail
+        self.table = table
 
     def convert_one(self,value):
-        for conv in self.converters:
+        for conv in self.head:
+            value = conv(value)
+        table = self.table
+        if table is not None:
+            try:
+                return table[value]
+            except (KeyError, TypeError):
+                pass
+        for conv in self.tail:
             value = conv(value)
         return value
 
@@ -71,6 +149,56 @@ class CodeConverter:
         gen = (self.convert_one(v) for v in value)
         return self.to_code.list_constructor(gen)
 
+    def convert_batch(self,values,on_error='raise'):
+        """
+        Converts each item of ``values``.  Unlike ``__call__``, this never
+        has to guess whether it was given one value or many, and an
+        invalid item does not abort the rest of the batch.
+
+        Returns a tuple ``(results, mask)``, where ``mask`` has one entry
+        per input item, which is ``False`` if the item could not be
+        converted.
+
+        Error behaviors:
+        'raise' - Raise the conversion error.
+        'none' - Put ``None`` in the results in place of the failed item.
+        'skip' - Leave the failed item out of the results.
+
+            >>> from puzzletools.morse import Morse
+            >>> conv = CodeConverter.cached(Morse,Alphabet)
+            >>> conv.convert_batch(['...','---','.-.-.-.-','...'],on_error='none')
+            (['S', 'O', None, 'S'], [True, True, False, True])
+            >>> conv.convert_batch(['...','---','.-.-.-.-','...'],on_error='skip')
+            (['S', 'O', 'S'], [True, True, False, True])
+        """
+        if on_error!='raise' and on_error!='none' and on_error!='skip':
+            raise ValueError('Unrecognized error behavior.  Allowed behaviors are raise, none, skip.')
+        head = self.head
+        tail = self.tail
+        table = self.table
+        missing = object()
+        results = []
+        mask = []
+        for value in values:
+            try:
+                for conv in head:
+                    value = conv(value)
+                result = missing if table is None else table.get(value,missing)
+                if result is missing:
+                    for conv in tail:
+                        value = conv(value)
+                    result = value
+            except _conversion_errors:
+                if on_error=='raise':
+                    raise
+                if on_error=='none':
+                    results.append(None)
+                mask.append(False)
+                continue
+            results.append(result)
+            mask.append(True)
+        return (results,mask)
+
     def __call__(self,value):
         try:
             return self.convert_one(value)
@@ -112,7 +240,7 @@ class StringEncoder:
             if code is None:
                 raise ValueError("Either 'encoder' or 'code' must be specified")
             else:
-                self.encode = CodeConverter(Alphabet,code).convert_many
+                self.encode = CodeConverter.cached(Alphabet,code).convert_many
         else:
             self.encode = encoder
 
@@ -147,10 +275,57 @@ class StringDecoder:
             if code is None:
                 raise ValueError("Either 'decoder' or 'code' must be specified")
             else:
-                self.decode = CodeConverter(code,Alphabet).convert_many
+                self.decode = CodeConverter.cached(code,Alphabet).convert_many
         else:
             self.decode = decoder
 
+    def _decode_word(self,w):
+        return ''.join(self.decode(w.strip(self.sep).split(self.sep)))
+
     def __call__(self,s):
         wds=s.split(self.wsep)
-        return ' '.join(''.join(self.decode(w.strip(self.sep).split(self.sep))) for w in wds)
+        return ' '.join(self._decode_word(w) for w in wds)
+
+    def _stream_tokens(self,w):
+        # line breaks inside a word separate characters
+        if self.sep.isspace():
+            return w.split()
+        tokens = w.replace('\r',self.sep).replace('\n',self.sep).split(self.sep)
+        return [t.strip() for t in tokens if t.strip()]
+
+    def decode_stream(self,source,chunk_size=65536):
+        """
+        Decodes a long transcript piece by piece, yielding the decoded words
+        as soon as they are complete.  ``source`` may be a file object or
+        an iterable of strings; tokens may be split across chunks.  Only
+        the current partial word is held in memory.  Line breaks are
+        treated as character separators, and empty words (for example,
+        from a trailing newline) are skipped.
+
+            >>> import io
+            >>> from puzzletools.morse import Morse
+            >>> dec = StringDecoder(Morse)
+            >>> list(dec.decode_stream(['-- --','- .-. ... . / -.','-. --- -.. .\\n']))
+            ['MORSE', 'CODE']
+            >>> f = io.StringIO('... ---\\n... / .-\\n-. -.. /\\n... --- ...\\n')
+            >>> list(dec.decode_stream(f,chunk_size=4))
+            ['SOS', 'AND', 'SOS']
+            >>> dec = StringDecoder(Morse,sep='|')
+            >>> list(dec.decode_stream(io.StringIO('...|---|\\n...\\n/.-|\\n-.|-..')))
+            ['SOS', 'AND']
+        """
+        if hasattr(source,'read'):
+            chunks = iter(lambda: source.read(chunk_size),'')
+        else:
+            chunks = source
+        buf = ''
+        for chunk in chunks:
+            buf += chunk
+            *wds, buf = buf.split(self.wsep)
+            for w in wds:
+                tokens = self._stream_tokens(w)
+                if tokens:
+                    yield ''.join(self.decode(tokens))
+        tokens = self._stream_tokens(buf)
+        if tokens:
+            yield ''.join(self.decode(tokens))
@@ -2,6 +2,10 @@ from puzzletools.code import Code
 
 class TimeZone(Code):
 
+    @staticmethod
+    def domain():
+        return range(-12,13)
+
     @staticmethod
     def to_parent(n):
         """
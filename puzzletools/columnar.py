@@ -0,0 +1,108 @@
+"""
+Column-oriented storage for large enumerations.  Instead of one object
+per item, each field is stored as a single array (a typed NumPy array for
+numeric and boolean fields), and item objects are only created when they
+are accessed.  Filters can work directly on the columns:
+
+    >>> from puzzletools.enumeration import EnumerationMeta
+    >>> class City(metaclass=EnumerationMeta, columnar=True):
+    ...     name: str
+    ...     latitude: float
+    >>> City.items = ColumnarItems.from_rows(City, [('Boston', 42.4), ('Miami', 25.8), ('Oslo', 59.9)])
+    >>> City.items[1]
+    City(name='Miami', latitude=25.8)
+    >>> [c.name for c in City.where(City.column('latitude') > 40)]
+    ['Boston', 'Oslo']
+"""
+
+from collections.abc import Sequence
+from typing import Optional
+import attr
+import numpy as np
+
+def _column_dtype(ty):
+    if ty is int:
+        return np.int64
+    if ty is float or ty==Optional[float]:
+        return np.float64
+    if ty is bool:
+        return np.bool_
+    return object
+
+def _make_column(values, ty):
+    dtype = _column_dtype(ty)
+    if dtype is np.float64:
+        values = [np.nan if v is None else v for v in values]
+    col = np.empty(len(values), dtype=dtype)
+    if dtype is object:
+        # assigning element by element keeps tuple values from being unpacked
+        for i, v in enumerate(values):
+            col[i] = v
+    else:
+        col[:] = values
+    return col
+
+def _getter(ty):
+    dtype = _column_dtype(ty)
+    if dtype is object:
+        return None
+    if ty==Optional[float]:
+        return lambda x: None if np.isnan(x) else float(x)
+    return lambda x: x.item()
+
+class ColumnarItems(Sequence):
+    """
+    The items of an enumeration, stored by column.  ``columns`` is a
+    dictionary mapping each field name to an array of values.
+    """
+
+    def __init__(self, cls, columns):
+        self.cls = cls
+        self.fields = attr.fields(cls)
+        self.columns = columns
+        self._getters = [(columns[f.name], _getter(f.type)) for f in self.fields]
+
+    @classmethod
+    def from_rows(cls, ty, rows, structure=None):
+        """
+        Builds the columns for the enumeration ``ty`` from an iterable of
+        rows, with the fields in order.  If ``structure`` is given, it is
+        called as ``structure(value, field_type)`` to convert each value.
+        """
+        fields = attr.fields(ty)
+        values = [[] for _ in fields]
+        for row in rows:
+            for vals, v in zip(values, row):
+                vals.append(v)
+        if structure is not None:
+            values = [[structure(v, f.type) for v in vals] for vals, f in zip(values, fields)]
+        return cls(ty, { f.name : _make_column(vals, f.type) for vals, f in zip(values, fields) })
+
+    def rows(self):
+        """
+        Yields each item as a tuple, without creating any item objects.
+        """
+        for i in range(len(self)):
+            yield self._row(i)
+
+    def _row(self, i):
+        return tuple(col[i] if get is None else get(col[i]) for col, get in self._getters)
+
+    def __len__(self):
+        return len(self.columns[self.fields[0].name]) if self.fields else 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.where(index)
+        if index<0:
+            index += len(self)
+        if not 0<=index<len(self):
+            raise IndexError('item index out of range')
+        return self.cls(*self._row(index))
+
+    def where(self, selector):
+        """
+        Returns the items selected by ``selector``, which can be a boolean
+        mask, an array of indices, or a slice.
+        """
+        return ColumnarItems(self.cls, { k : v[selector] for k, v in self.columns.items() })
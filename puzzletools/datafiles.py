@@ -1,18 +1,159 @@
-import cattr
-import codecs
+from collections.abc import Mapping, Sequence
 import datetime
-import pkg_resources
+import pkgutil
+import typing
 
-def _parse_date(s, cl):
+class lazy_class_attribute:
+    '''
+    A class attribute whose value is computed by calling the decorated
+    function (with the class as its argument) the first time it is
+    accessed.  The value then replaces the descriptor, so later accesses
+    are ordinary attribute lookups.  This keeps data tables from being
+    loaded when a module is imported but they are never used.
+
+        >>> class Squares:
+        ...     @lazy_class_attribute
+        ...     def table(cls):
+        ...         print('computing')
+        ...         return [i*i for i in range(5)]
+        >>> Squares.table
+        computing
+        [0, 1, 4, 9, 16]
+        >>> Squares().table
+        [0, 1, 4, 9, 16]
+    '''
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.__doc__ = fn.__doc__
+
+    def __set_name__(self, owner, name):
+        self.owner = owner
+        self.name = name
+
+    def __get__(self, obj, cls=None):
+        value = self.fn(self.owner)
+        setattr(self.owner, self.name, value)
+        return value
+
+class LazyMapping(Mapping):
+    '''
+    A read-only mapping whose contents are computed by calling ``fn`` the
+    first time that they are needed.  This lets a module export a data
+    table without loading it at import time.
+
+        >>> squares = LazyMapping(lambda: { i : i*i for i in range(5) })
+        >>> squares[3], len(squares)
+        (9, 5)
+    '''
+
+    def __init__(self, fn):
+        self._fn = fn
+        self._table = None
+
+    def _get(self):
+        if self._table is None:
+            self._table = self._fn()
+        return self._table
+
+    def __getitem__(self, key):
+        return self._get()[key]
+
+    def __iter__(self):
+        return iter(self._get())
+
+    def __len__(self):
+        return len(self._get())
+
+    def __repr__(self):
+        return repr(self._get())
+
+class LazySequence(Sequence):
+    '''
+    A read-only sequence whose contents are computed by calling ``fn`` the
+    first time that they are needed.  See ``LazyMapping``.
+    '''
+
+    def __init__(self, fn):
+        self._fn = fn
+        self._table = None
+
+    def _get(self):
+        if self._table is None:
+            self._table = self._fn()
+        return self._table
+
+    def __getitem__(self, index):
+        return self._get()[index]
+
+    def __len__(self):
+        return len(self._get())
+
+    def __repr__(self):
+        return repr(self._get())
+
+def _parse_date(s):
     return datetime.datetime.strptime(s, '%Y-%m-%d').date()
 
-_conv = cattr.Converter()
-_conv.register_structure_hook(datetime.date, _parse_date)
+def _read_data(filename):
+    try:
+        from importlib.resources import files
+    except ImportError:
+        return pkgutil.get_data(__name__, 'data/' + filename).decode('utf-8')
+    return (files(__package__) / 'data' / filename).read_text(encoding='utf-8')
+
+_cattr_conv = None
+
+def _fallback_parser(ty):
+    global _cattr_conv
+    if _cattr_conv is None:
+        import cattr
+        _cattr_conv = cattr.Converter()
+    return lambda s: _cattr_conv.structure(s, ty)
+
+def _field_parser(ty):
+    if ty is str:
+        return None
+    if ty is int or ty is float:
+        return ty
+    if ty is datetime.date:
+        return _parse_date
+    args = getattr(ty, '__args__', ())
+    if getattr(ty, '__origin__', None) is typing.Union and len(args)==2 and type(None) in args:
+        inner = _field_parser(args[0] if args[1] is type(None) else args[1])
+        if inner is None:
+            return lambda s: s or None
+        return lambda s: inner(s) if s else None
+    return _fallback_parser(ty)
+
+_structurers = {}
+
+def _row_structurer(ty):
+    '''
+    Returns a function that converts a row of strings into an instance of
+    the attrs class ``ty``.  The function is generated once per class, with
+    the conversion for each field written out inline.
+    '''
+    fn = _structurers.get(ty)
+    if fn is None:
+        import attr
+        ns = { 'ty': ty }
+        args = []
+        for i, field in enumerate(attr.fields(ty)):
+            parser = _field_parser(field.type)
+            if parser is None:
+                args.append('row[%d]' % i)
+            else:
+                ns['p%d' % i] = parser
+                args.append('p%d(row[%d])' % (i, i))
+        exec('def structure(row):\n    return ty(%s)\n' % ', '.join(args), ns)
+        fn = _structurers[ty] = ns['structure']
+    return fn
 
 def load_tsv(filename, ty=None):
-    with pkg_resources.resource_stream(__name__, 'data/' + filename) as f:
-        gen = (l.strip('\r\n').split('\t') for l in codecs.getreader('utf-8')(f))
-        if ty is None:
-            return list(gen)
-        else:
-            return [_conv.structure_attrs_fromtuple(row, ty) for row in gen]
+    rows = [l.split('\t') for l in _read_data(filename).splitlines()]
+    if ty is None:
+        return rows
+    else:
+        structure = _row_structurer(ty)
+        return [structure(row) for row in rows]
@@ -1,12 +1,105 @@
 import attr
+from collections.abc import Mapping, Sequence
+from puzzletools import cache
+import re, typing, unicodedata
+
+_lazy_enumerations = []
+
+def lazy_enumerations():
+    '''
+    Returns a list of the enumerations whose items are loaded lazily.
+    '''
+    return list(_lazy_enumerations)
+
+_nonalnum_re = re.compile(r'[\W_]+')
+
+def normalize_key(s):
+    '''
+    Normalizes a string for use as an index key, by removing accents,
+    punctuation, and spaces, and ignoring case.
+
+        >>> normalize_key('São Tomé & Príncipe')
+        'saotomeprincipe'
+    '''
+    s = unicodedata.normalize('NFKD', s)
+    s = ''.join(c for c in s if not unicodedata.combining(c))
+    return _nonalnum_re.sub('', s.casefold())
+
+# Python 3.6 reports typing.Sequence and typing.List as the origins of
+# subscripted types; later versions report the underlying classes
+_sequence_origins = (Sequence, list, typing.Sequence, typing.List)
+
+def _is_sequence_type(ty):
+    '''
+    Returns whether ``ty`` is a subscripted sequence or list type.
+
+        >>> _is_sequence_type(typing.Sequence[str]), _is_sequence_type(typing.List[int])
+        (True, True)
+        >>> _is_sequence_type(str), _is_sequence_type(typing.Optional[str])
+        (False, False)
+    '''
+    return getattr(ty, '__origin__', None) in _sequence_origins
+
+_normalizers = {
+    None: None,
+    'casefold': str.casefold,
+    'normalize': normalize_key,
+}
+
+class Index(Mapping):
+    '''
+    A read-only mapping from the values of a field of an enumeration to
+    the items with those values.  See ``EnumerationMeta.by``.
+    '''
+
+    def __init__(self, table, normalize=None):
+        self.table = table
+        self.normalize = normalize
+
+    def __getitem__(self, key):
+        if self.normalize is not None:
+            key = self.normalize(key)
+        return self.table[key]
+
+    def __contains__(self, key):
+        if self.normalize is not None:
+            key = self.normalize(key)
+        return key in self.table
+
+    def __iter__(self):
+        return iter(self.table)
+
+    def __len__(self):
+        return len(self.table)
 
 class EnumerationMeta(type):
 
-    def __new__(cls,name,bases,dct):
+    def __new__(cls,name,bases,dct,columnar=False,frozen=True,slots=True):
         c = super().__new__(cls,name,bases,dct)
-        return attr.s(auto_attribs=True)(c)
+        # attrs builds slotted classes by calling the metaclass again
+        if '__attrs_attrs__' in dct:
+            return c
+        if frozen:
+            for field, ty in dct.get('__annotations__', {}).items():
+                if _is_sequence_type(ty) and field not in dct:
+                    setattr(c, field, attr.ib(converter=tuple))
+        c = attr.s(auto_attribs=True,frozen=frozen,slots=slots)(c)
+        c.columnar = columnar
+        return c
 
-    def __init__(cls,name,bases,dct):
+    def __init__(cls,name,bases,dct,columnar=False,frozen=True,slots=True):
+        '''
+        Keyword arguments:
+        ``columnar`` - If true, items are stored by column, and item objects
+        are only created when they are accessed (see
+        ``puzzletools.columnar``).  This saves memory for large
+        enumerations, and allows filtering with ``column`` and ``where``.
+        ``frozen`` - If true (the default), items are immutable and
+        hashable, so they can be used in sets and as dictionary keys.
+        Sequence fields are converted to tuples.
+        ``slots`` - If true (the default), items use ``__slots__`` rather
+        than a per-instance ``__dict__``.
+        '''
         super().__init__(name,bases,dct)
         cls._set_items([])
 
@@ -16,22 +109,135 @@ class EnumerationMeta(type):
     def __len__(self):
         return len(self.items)
 
-    def __contains__(self):
+    def __contains__(self, item):
         return item in self.items
 
+    def by(self, field, unique=None, normalize=None):
+        '''
+        Returns an ``Index`` for looking up items by the value of ``field``.
+        If ``unique`` is true, each value maps to the first item with that
+        value; otherwise, it maps to a list of all such items.  If the field
+        holds a sequence, the item is indexed under each of its elements.
+        ``normalize`` can be ``'casefold'`` to ignore case, ``'normalize'``
+        to also ignore accents, spaces, and punctuation (see
+        ``normalize_key``), or a function to apply to keys.
+
+        Defaults for each field can be declared in the class attribute
+        ``indexes``, a dictionary mapping field names to dictionaries of
+        keyword arguments.  If nothing is declared, the index is unique.
+        The index is built on first use and discarded if the items change.
+
+            >>> from puzzletools.enumerations import ChemicalElement
+            >>> ChemicalElement.by('symbol')['fe'].name
+            'Iron'
+            >>> ChemicalElement.by('number')[79].symbol
+            'Au'
+        '''
+        options = getattr(self, 'indexes', {}).get(field, {})
+        if unique is None:
+            unique = options.get('unique', True)
+        if normalize is None:
+            normalize = options.get('normalize')
+        key = (field, unique, normalize)
+        index = self._indexes.get(key)
+        if index is None:
+            norm = _normalizers.get(normalize, normalize)
+            table = {}
+            for item in self.items:
+                value = getattr(item, field)
+                for v in value if isinstance(value, (list, tuple)) else (value,):
+                    if v is None:
+                        continue
+                    if norm is not None:
+                        v = norm(v)
+                    if unique:
+                        table.setdefault(v, item)
+                    else:
+                        table.setdefault(v, []).append(item)
+            index = self._indexes[key] = Index(table, norm)
+        return index
+
     def __reversed__(self):
         return reversed(self.items)
 
-    def set_items_lazy(self, fn):
+    def set_items_lazy(self, fn, cache=False, ttl=None):
+        '''
+        Sets a function that will be called to load the items the first time
+        that they are needed.  If ``cache`` is true, the items are also
+        stored in the persistent cache (see ``puzzletools.cache``), so that
+        later processes can load them from disk instead of calling ``fn``.
+        ``ttl`` is the number of seconds for which the cached items are
+        considered fresh.
+        '''
         self._item_loader = fn
+        self._cache_items = cache
+        self._cache_ttl = ttl
+        if self not in _lazy_enumerations:
+            _lazy_enumerations.append(self)
+
+    def _cache_key(self):
+        return '%s.%s' % (self.__module__, self.__qualname__)
+
+    def _load_items(self):
+        if not self._cache_items:
+            return self._item_loader()
+        schema = [(a.name, repr(a.type)) for a in attr.fields(self)]
+        rows = cache.cached(self._cache_key(), self._item_rows, schema, self._cache_ttl)
+        if self.columnar:
+            from puzzletools.columnar import ColumnarItems
+            return ColumnarItems.from_rows(self, rows)
+        return [self(*row) for row in rows]
+
+    def _item_rows(self):
+        items = self._item_loader()
+        if hasattr(items, 'rows'):
+            return list(items.rows())
+        return [attr.astuple(item, recurse=False) for item in items]
+
+    def column(self, field):
+        '''
+        Returns the values of ``field`` for all items, as a NumPy array.
+        For columnar enumerations, this is the stored column itself.
+        '''
+        items = self.items
+        if hasattr(items, 'columns'):
+            return items.columns[field]
+        from puzzletools.columnar import _make_column
+        return _make_column([getattr(item, field) for item in items], attr.fields_dict(self)[field].type)
+
+    def where(self, selector):
+        '''
+        Returns the items selected by ``selector``, which can be a boolean
+        mask (for example, one computed from ``column``), an array of
+        indices, or a slice.
+        '''
+        items = self.items
+        if hasattr(items, 'where'):
+            return items.where(selector)
+        from puzzletools.columnar import ColumnarItems
+        rows = [attr.astuple(item, recurse=False) for item in items]
+        return ColumnarItems.from_rows(self, rows).where(selector)
+
+    def invalidate_cache(self):
+        '''
+        Removes this enumeration's items from the persistent cache, and from
+        memory, so that they will be loaded again when they are next needed.
+        '''
+        cache.invalidate(self._cache_key())
+        if self._item_loader:
+            self._items = []
+            self._indexes = {}
 
     def _get_items(self):
         if not self._items and self._item_loader:
-            self._items = self._item_loader()
+            self._items = self._load_items()
+            self._indexes = {}
         return self._items
 
     def _set_items(self, items):
         self._items = items
+        self._indexes = {}
         self._item_loader = None
+        self._cache_items = False
 
     items = property(_get_items, _set_items)
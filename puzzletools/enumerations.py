@@ -1,5 +1,6 @@
 from puzzletools.enumeration import EnumerationMeta
 from puzzletools.datafiles import load_tsv
+from puzzletools.segmentation import SymbolParse, TokenSet
 import datetime
 
 class ChemicalElement(metaclass=EnumerationMeta):
@@ -7,7 +8,9 @@ class ChemicalElement(metaclass=EnumerationMeta):
     symbol: str
     name: str
 
-ChemicalElement.items = load_tsv('elements.tsv', ChemicalElement)
+    indexes = { 'symbol': { 'normalize': 'casefold' }, 'name': { 'normalize': 'casefold' } }
+
+ChemicalElement.set_items_lazy(lambda: load_tsv('elements.tsv', ChemicalElement))
 
 class State(metaclass=EnumerationMeta):
     name: str
@@ -15,29 +18,56 @@ class State(metaclass=EnumerationMeta):
     capital: str
     statehood: datetime.date
 
-State.items = load_tsv('states.tsv', State)
+    indexes = { 'abbr': { 'normalize': 'casefold' }, 'name': { 'normalize': 'casefold' } }
+
+State.set_items_lazy(lambda: load_tsv('states.tsv', State))
 
-_short_symbols = { e.symbol for e in ChemicalElement.items if len(e.symbol)<=2 }
+def _element_symbols():
+    return TokenSet.for_field(ChemicalElement, 'symbol', weight='number')
 
 def parse_as_element_symbols(s):
     '''
     Given a string `s`, returns a tuple whose first element is the number of
     ways of parsing `s` as a sequence of element symbols, and whose second
-    element is one such parsing (or `None` if none exists).
+    element is one such parsing (or `None` if none exists).  See
+    ``element_symbol_parse`` for more ways to examine the parsings.
 
         >>> parse_as_element_symbols('the south')
         (1, ['Th', 'Es', 'O', 'U', 'Th'])
     '''
-    s = ''.join(c for c in s if c.isalpha())
-    partial = [[] if i==0 else None for i in range(len(s)+1)]
-    count = [1 if i==0 else 0 for i in range(len(s)+1)]
-    for i in range(len(s)):
-        if count[i]:
-            for j in range(1,3):
-                if i+j<=len(s):
-                    sym = s[i:i+j].title()
-                    if sym in _short_symbols:
-                        count[i+j]+=count[i]
-                        if partial[i+j] is None:
-                            partial[i+j]=partial[i]+[sym]
-    return (count[-1],partial[-1])
+    p = element_symbol_parse(s)
+    return (p.count, p.first())
+
+def element_symbol_parse(s):
+    '''
+    Returns a ``SymbolParse`` (see ``puzzletools.segmentation``) containing
+    all of the ways of parsing `s` as a sequence of element symbols.  By
+    default, ``best`` scores parsings by the sum of the atomic numbers.
+
+        >>> element_symbol_parse('bison').best()
+        (114, ['Bi', 'S', 'O', 'N'])
+    '''
+    return _element_symbols().parse(s)
+
+def element_symbol_counts(words, chunk_size=65536):
+    '''
+    Returns a NumPy array containing the number of ways of parsing each of
+    ``words`` as a sequence of element symbols.  All of the words are
+    processed together, so this is much faster than calling
+    ``parse_as_element_symbols`` on each word.
+
+        >>> element_symbol_counts(['bison', 'carbon', 'the south', 'quiz'])
+        array([2, 2, 1, 0])
+    '''
+    return _element_symbols().counts(words, chunk_size)
+
+def element_symbol_parses(words, min_count=1):
+    '''
+    Yields a pair ``(word, parse)`` for each of ``words`` that can be
+    parsed as a sequence of element symbols in at least ``min_count``
+    ways, where ``parse`` is a ``SymbolParse``.
+
+        >>> [(w, p.best()) for w, p in element_symbol_parses(['bison', 'quiz', 'carbon'], 2)]
+        [('bison', (114, ['Bi', 'S', 'O', 'N'])), ('carbon', (72, ['Ca', 'Rb', 'O', 'N']))]
+    '''
+    return _element_symbols().parse_many(words, min_count)
@@ -2,14 +2,12 @@ from puzzletools.enumeration import EnumerationMeta
 from puzzletools.enumerations import State
 from puzzletools.table_parser import csv_rows, HTMLTable, allow_none, Raw, view
 from puzzletools.morse import dash_to_hyphen
-from urllib.request import urlopen
-from time import sleep
+from puzzletools.fetch import urlopen
+from concurrent.futures import ThreadPoolExecutor
 import datetime
 import unicodedata, string, re
-from bs4 import BeautifulSoup
 from urllib.error import HTTPError
 import itertools
-import cattr
 from typing import Optional, Sequence
 
 def download_wikitable(url,tablenum=0):
@@ -24,11 +22,23 @@ def strpdate(s,fmt):
 def _id_hook(data, cl):
     return data
 
-_conv = cattr.Converter()
-_conv.register_structure_hook(datetime.date, _id_hook)
+_conv = None
+
+def _converter():
+    global _conv
+    if _conv is None:
+        import cattr
+        conv = cattr.Converter()
+        conv.register_structure_hook(datetime.date, _id_hook)
+        _conv = conv
+    return _conv
 
 def load_enumeration(cls, fields, rows):
-    return [_conv.structure_attrs_fromtuple(row, cls) for row in view(rows, fields)]
+    conv = _converter()
+    if cls.columnar:
+        from puzzletools.columnar import ColumnarItems
+        return ColumnarItems.from_rows(cls, view(rows, fields), conv.structure)
+    return [conv.structure_attrs_fromtuple(row, cls) for row in view(rows, fields)]
 
 class Country(metaclass=EnumerationMeta):
     name: str
@@ -42,7 +52,7 @@ def _countries():
     fields = [ 0, 1, 2, 3, (5, lambda x: x=='Yes')]
     return load_enumeration(Country, fields, rows)
 
-Country.set_items_lazy(_countries)
+Country.set_items_lazy(_countries, cache=True)
 
 def _us_states():
     rows = download_wikitable('https://en.m.wikipedia.org/wiki/List_of_states_and_territories_of_the_United_States')
@@ -76,7 +86,7 @@ def _resistor_colors():
         (9, lett)]
     return load_enumeration(ResistorColor, fields, rows)
 
-ResistorColor.set_items_lazy(_resistor_colors)
+ResistorColor.set_items_lazy(_resistor_colors, cache=True)
 
 class Zodiac(metaclass=EnumerationMeta):
     name: str
@@ -101,7 +111,7 @@ def _zodiac():
     fields = [ 0, (0, lookup), (2, parse_date(0)), (2, parse_date(1)) ]
     return load_enumeration(Zodiac,fields,rows)
 
-Zodiac.set_items_lazy(_zodiac)
+Zodiac.set_items_lazy(_zodiac, cache=True)
 
 class Currency(metaclass=EnumerationMeta):
     code: str
@@ -114,7 +124,7 @@ def _currency():
     fields = [ 0, 1, 3, (Raw(4), HTMLTable.wikilink_list_format) ]
     return load_enumeration(Currency,fields,rows)
 
-Currency.set_items_lazy(_currency)
+Currency.set_items_lazy(_currency, cache=True)
 
 class Language(metaclass=EnumerationMeta):
     name: str
@@ -126,27 +136,26 @@ def _language():
     fields = [2, 3, 4]
     return load_enumeration(Language,fields,rows)
 
-Language.set_items_lazy(_language)
+Language.set_items_lazy(_language, cache=True)
 
 _course_url_re = re.compile('m([0-9A-Z]+)a.html')
 _newline_strip_re = re.compile('\n.*')
 
-def mit_subject_listing():
-    entries=[]
+def mit_subject_listing(max_workers=4):
+    from bs4 import BeautifulSoup
     soup = BeautifulSoup(urlopen('http://student.mit.edu/catalog/index.cgi'),'lxml')
-    for elt in soup.find_all('a'):
-        m = _course_url_re.match(elt.attrs['href'])
-        entries.extend(mit_subject_listing_by_course(m.groups()[0]))
-    return entries
+    courses = [_course_url_re.match(elt.attrs['href']).groups()[0] for elt in soup.find_all('a')]
+    with ThreadPoolExecutor(max_workers) as ex:
+        return list(itertools.chain.from_iterable(ex.map(mit_subject_listing_by_course, courses)))
 
 def mit_subject_listing_by_course(num):
+    from bs4 import BeautifulSoup
     num=str(num)
     entries=[]
     for l in string.ascii_lowercase:
         try:
             soup=BeautifulSoup(urlopen('http://student.mit.edu/catalog/m%s%s.html'%(num,l)),'lxml')
             entries.extend(_newline_strip_re.sub('',elt.text).split(' ',1) for elt in soup.find_all('h3'))
-            sleep(1)
         except HTTPError:
             break
     return entries
@@ -161,7 +170,7 @@ def _london_underground_stations():
     fields = [0, (Raw(2), HTMLTable.wikilink_list_format)]
     return load_enumeration(LondonUnderground,fields,rows)
 
-LondonUnderground.set_items_lazy(_london_underground_stations)
+LondonUnderground.set_items_lazy(_london_underground_stations, cache=True)
 
 class MBTAStation(metaclass=EnumerationMeta):
     name: str
@@ -173,7 +182,7 @@ def _mbta_stations():
     fields = [0, (Raw(1),HTMLTable.wikilink_list_format)]
     return load_enumeration(MBTAStation,fields,rows)
 
-MBTAStation.set_items_lazy(_mbta_stations)
+MBTAStation.set_items_lazy(_mbta_stations, cache=True)
 
 _paris_sep_re = re.compile(r'\s*[&,]\s*')
 
@@ -188,7 +197,7 @@ def _paris_metro_stations():
     fields = [0, 2, (3, lambda x: _paris_sep_re.split(x)) ]
     return load_enumeration(ParisMetro,fields,rows)
 
-ParisMetro.set_items_lazy(_paris_metro_stations)
+ParisMetro.set_items_lazy(_paris_metro_stations, cache=True)
 
 _washington_alt_re = re.compile(r'WMATA (\w+).svg')
 
@@ -210,9 +219,9 @@ def _washington_metro_stations():
     fields = [0, (Raw(1),_washington_lines)]
     return load_enumeration(WashingtonMetro,fields,rows)
 
-WashingtonMetro.set_items_lazy(_washington_metro_stations)
+WashingtonMetro.set_items_lazy(_washington_metro_stations, cache=True)
 
-class Airport(metaclass=EnumerationMeta):
+class Airport(metaclass=EnumerationMeta, columnar=True):
     name: str
     city: str
     country: str
@@ -225,15 +234,18 @@ class Airport(metaclass=EnumerationMeta):
     dst: str
     timezone: str
 
+    indexes = { 'city': { 'unique': False, 'normalize': 'normalize' },
+        'country': { 'unique': False } }
+
 def _airports():
     url='https://raw.githubusercontent.com/jpatokal/openflights/master/data/airports.dat'
     rows = download_csv(url,enc='iso-8859-1')
     fields = [ 1, 2, 3, 4, 5, 6, 7, 8, (9, allow_none(float)), 10, 11 ]
     return load_enumeration(Airport,fields,rows)
 
-Airport.set_items_lazy(_airports)
+Airport.set_items_lazy(_airports, cache=True)
 
-class Airline(metaclass=EnumerationMeta):
+class Airline(metaclass=EnumerationMeta, columnar=True):
     name: str
     alias: Optional[str]
     iata: str
@@ -242,6 +254,8 @@ class Airline(metaclass=EnumerationMeta):
     country: str
     active: bool
 
+    indexes = { 'iata': { 'unique': False }, 'country': { 'unique': False } }
+
 def _airlines():
     url='https://raw.githubusercontent.com/jpatokal/openflights/master/data/airlines.dat'
     rows = itertools.islice(download_csv(url,enc='iso-8859-1'),2,None)
@@ -249,9 +263,9 @@ def _airlines():
         (7, lambda s: s=='Y') ]
     return load_enumeration(Airline,fields,rows)
 
-Airline.set_items_lazy(_airlines)
+Airline.set_items_lazy(_airlines, cache=True)
 
-class Stock(metaclass=EnumerationMeta):
+class Stock(metaclass=EnumerationMeta, columnar=True):
     symbol: str
     name: str
     price: Optional[float]
@@ -274,4 +288,4 @@ def _stocks():
         (5, allow_none(int)), 6, 7, 9 ]
     return load_enumeration(Stock,fields,rows)
 
-Stock.set_items_lazy(_stocks)
+Stock.set_items_lazy(_stocks, cache=True)
@@ -0,0 +1,41 @@
+"""
+Helpers for downloading data politely.  Requests to the same host are
+spaced at least ``rate_limiter.interval`` seconds apart, while requests to
+different hosts may run concurrently.
+"""
+
+import threading, time
+import urllib.request
+from urllib.parse import urlsplit
+
+class HostRateLimiter:
+    """
+    Spaces out requests to each host.  This is safe to use from multiple
+    threads.
+    """
+
+    def __init__(self, interval=1.0):
+        self.interval = interval
+        self._next = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        """
+        Blocks until a request to the host of ``url`` is allowed.
+        """
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            t = max(now, self._next.get(host, now))
+            self._next[host] = t+self.interval
+        if t>now:
+            time.sleep(t-now)
+
+rate_limiter = HostRateLimiter()
+
+def urlopen(url, *args, **kwargs):
+    """
+    Like ``urllib.request.urlopen``, but rate limited by host.
+    """
+    rate_limiter.wait(url)
+    return urllib.request.urlopen(url, *args, **kwargs)
@@ -0,0 +1,73 @@
+"""
+Measures how long it takes to import each puzzletools module in a fresh
+interpreter, using ``python -X importtime``.  Each module is imported
+``repeat`` times and the fastest run is reported, to reduce the noise
+from disk caching.
+
+Example usage:
+python -m puzzletools.importtime
+python -m puzzletools.importtime puzzletools.morse puzzletools.amino --detail 5
+"""
+
+import argparse, pkgutil, subprocess, sys
+
+def default_modules():
+    """
+    Returns the names of all of the modules in the puzzletools package,
+    except for the test modules.
+    """
+    import puzzletools
+    return sorted('puzzletools.' + m.name for m in pkgutil.iter_modules(puzzletools.__path__)
+        if not m.name.startswith('tests'))
+
+def import_times(module):
+    """
+    Imports ``module`` in a new interpreter and returns a list of tuples
+    ``(self_us, cumulative_us, name)``, one for each module that was
+    imported, in the order reported by ``-X importtime``.
+    """
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True)
+    if proc.returncode!=0:
+        raise ImportError('Could not import %s:\n%s' % (module, proc.stderr))
+    times = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        try:
+            times.append((int(fields[0]), int(fields[1]), fields[2].strip()))
+        except ValueError:
+            # the header line
+            pass
+    return times
+
+def benchmark(modules=None, repeat=3):
+    """
+    Returns a list of tuples ``(module, seconds, times)``, where ``seconds``
+    is the fastest cumulative import time of ``module`` over ``repeat``
+    runs, and ``times`` is the output of ``import_times`` for that run.
+    """
+    if modules is None:
+        modules = default_modules()
+    results = []
+    for module in modules:
+        best = None
+        for _ in range(repeat):
+            times = import_times(module)
+            total = next((cum for _, cum, name in times if name==module), 0)
+            if best is None or total<best[0]:
+                best = (total, times)
+        results.append((module, best[0]/1e6, best[1]))
+    return results
+
+if __name__=='__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('modules',help='modules to import (default: all puzzletools modules)',nargs='*')
+    parser.add_argument('--repeat',help='number of runs per module (default 3)',type=int,default=3)
+    parser.add_argument('--detail',help='also show the N slowest imports for each module',type=int,default=0)
+    args = parser.parse_args()
+    for module, seconds, times in benchmark(args.modules or None, args.repeat):
+        print('%-40s %7.1fms' % (module, seconds*1e3))
+        for self_us, _, name in sorted(times, reverse=True)[:args.detail]:
+            print('    %-36s %7.1fms' % (name, self_us/1e3))
@@ -9,9 +9,9 @@ Encoder and decoder for Morse code.
     'MORSE CODE'
 '''
 
-import re
+import heapq, math, re, string
 from puzzletools.code import Code, reverse_dict
-from puzzletools.datafiles import load_tsv
+from puzzletools.datafiles import lazy_class_attribute, load_tsv
 
 _dash_hyphen_re = re.compile('[\u2010\u2011\u2012\u2013\u2014\u2015\u2043\u2212\uff0d]')
 
@@ -23,8 +23,153 @@ def dash_to_hyphen(s):
 
 class Morse(Code):
 
-    alpha_to_morse = dict(load_tsv('morse.tsv'))
-    morse_to_alpha = reverse_dict(alpha_to_morse)
+    @lazy_class_attribute
+    def alpha_to_morse(cls):
+        return dict(load_tsv('morse.tsv'))
 
-    to_parent = morse_to_alpha.__getitem__
-    from_parent = alpha_to_morse.__getitem__
+    @lazy_class_attribute
+    def morse_to_alpha(cls):
+        return reverse_dict(cls.alpha_to_morse)
+
+    @classmethod
+    def domain(cls):
+        return cls.morse_to_alpha.keys()
+
+    @classmethod
+    def to_parent(cls, data):
+        return cls.morse_to_alpha[data]
+
+    @classmethod
+    def from_parent(cls, data):
+        return cls.alpha_to_morse[data]
+
+_tries = {}
+
+def _morse_trie(alphabet):
+    trie = _tries.get(alphabet)
+    if trie is None:
+        trie = {}
+        for ch in alphabet:
+            node = trie
+            for c in Morse.alpha_to_morse[ch]:
+                node = node.setdefault(c, {})
+            node[''] = ch
+        _tries[alphabet] = trie
+    return trie
+
+class MorseWordIndex:
+    """
+    A wordlist indexed by the Morse encoding of each word, with the
+    letter separators removed.  ``wordlist`` can be either a mapping from
+    words to frequencies or an iterable of words (which are then given
+    equal weight).  Spaces in entries are ignored, and entries containing
+    characters outside of ``alphabet`` are skipped.
+    """
+
+    def __init__(self, wordlist, alphabet=string.ascii_uppercase):
+        if not hasattr(wordlist, 'items'):
+            wordlist = dict.fromkeys(wordlist, 1)
+        total = sum(wordlist.values())
+        self.alphabet = alphabet
+        self.codes = {}
+        self.maxlen = 0
+        for word, freq in wordlist.items():
+            word = word.upper().replace(' ', '')
+            if not word or freq<=0 or any(c not in alphabet for c in word):
+                continue
+            code = ''.join(Morse.alpha_to_morse[c] for c in word)
+            self.codes.setdefault(code, []).append((math.log(freq/total), word))
+            self.maxlen = max(self.maxlen, len(code))
+
+class UnspacedMorse:
+    """
+    The possible readings of a string of dots and dashes that has no letter
+    separators.  The readings are counted when the object is constructed,
+    but they are only generated as they are requested, so this is
+    practical even for strings with astronomically many readings.
+
+        >>> m = UnspacedMorse('......-...-..---')
+        >>> m.count
+        19796
+        >>> next(iter(m))
+        'EEEEEETEEETEETTT'
+        >>> wl = {'HELLO': 50, 'HELL': 20, 'BELL': 20, 'SEE': 20, 'O': 1}
+        >>> [' '.join(words) for score, words in m.best(wl, top=2)]
+        ['HELLO', 'HELL O']
+
+    Only the letters in ``alphabet`` are considered; by default, this is
+    the 26 letters of the English alphabet.
+    """
+
+    def __init__(self, s, alphabet=string.ascii_uppercase):
+        self.code = ''.join(dash_to_hyphen(s).split())
+        self.alphabet = alphabet
+        trie = _morse_trie(alphabet)
+        n = len(self.code)
+        counts = [0]*n + [1]
+        edges = [[] for _ in range(n)]
+        for i in range(n-1, -1, -1):
+            node = trie
+            for j in range(i, n):
+                node = node.get(self.code[j])
+                if node is None:
+                    break
+                ch = node.get('')
+                if ch is not None and counts[j+1]:
+                    edges[i].append((ch, j+1))
+                    counts[i] += counts[j+1]
+        self.counts = counts
+        self.edges = edges
+
+    @property
+    def count(self):
+        """
+        The number of ways of reading the string.
+        """
+        return self.counts[0]
+
+    def __iter__(self):
+        if not self.count:
+            return
+        n = len(self.code)
+        letters = []
+        stack = [iter(self.edges[0])] if n else []
+        if not n:
+            yield ''
+        while stack:
+            for ch, j in stack[-1]:
+                letters.append(ch)
+                if j == n:
+                    yield ''.join(letters)
+                    letters.pop()
+                else:
+                    stack.append(iter(self.edges[j]))
+                    break
+            else:
+                stack.pop()
+                if letters:
+                    letters.pop()
+
+    def best(self, wordlist, top=10):
+        """
+        Returns the ``top`` highest scoring ways of reading the string as a
+        sequence of words from ``wordlist``, which may be either a
+        ``MorseWordIndex`` or anything that can be used to construct one.
+        Each result is a pair ``(score, words)``, where the score is the
+        sum of the log frequencies of the words.
+        """
+        if not isinstance(wordlist, MorseWordIndex):
+            wordlist = MorseWordIndex(wordlist, self.alphabet)
+        codes = wordlist.codes
+        code = self.code
+        n = len(code)
+        best = [[] for _ in range(n)] + [[(0.0, ())]]
+        for i in range(n-1, -1, -1):
+            cands = []
+            for j in range(i+1, min(n, i+wordlist.maxlen)+1):
+                if not best[j]:
+                    continue
+                for lp, word in codes.get(code[i:j], ()):
+                    cands.extend((lp+score, (word,)+rest) for score, rest in best[j])
+            best[i] = heapq.nlargest(top, cands)
+        return [(score, list(words)) for score, words in best[0]]
@@ -0,0 +1,51 @@
+"""
+Downloads all of the enumerations that are loaded from the web, so that
+they are in the persistent cache (see ``puzzletools.cache``) before they
+are needed.  Sources are fetched concurrently; requests to the same host
+are still spaced out by ``puzzletools.fetch.rate_limiter``.
+
+Example usage:
+python -m puzzletools.prefetch --refresh
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from puzzletools.enumeration import lazy_enumerations
+import argparse, time
+
+def _load(enum):
+    start = time.monotonic()
+    try:
+        result = len(enum.items)
+    except Exception as e:
+        result = e
+    return (enum, time.monotonic()-start, result)
+
+def prefetch(enums=None, max_workers=8, refresh=False):
+    """
+    Loads the items of each enumeration in ``enums`` (by default, every
+    enumeration whose items are kept in the persistent cache, including
+    those in ``enumerations_web`` and ``subway``), using up to ``max_workers`` threads.
+
+    Returns a list of tuples ``(enum, seconds, result)``, where ``result`` is
+    the number of items loaded, or the exception that was raised.  If
+    ``refresh`` is true, cached items are discarded first.
+    """
+    if enums is None:
+        import puzzletools.enumerations_web, puzzletools.subway
+        enums = [e for e in lazy_enumerations() if e._cache_items]
+    if refresh:
+        for enum in enums:
+            enum.invalidate_cache()
+    with ThreadPoolExecutor(max_workers) as ex:
+        return list(ex.map(_load, enums))
+
+if __name__=='__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers',help='number of sources to fetch at once (default 8)',type=int,default=8)
+    parser.add_argument('--refresh',help='download sources even if they are already cached',action='store_true')
+    args = parser.parse_args()
+    start = time.monotonic()
+    for enum, seconds, result in prefetch(max_workers=args.workers, refresh=args.refresh):
+        status = 'error: %s' % result if isinstance(result, Exception) else '%d items' % result
+        print('%-40s %7.2fs  %s' % (enum._cache_key(), seconds, status))
+    print('%-40s %7.2fs' % ('total', time.monotonic()-start))
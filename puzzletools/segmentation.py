@@ -0,0 +1,347 @@
+'''
+Segmentation of strings into sequences of tokens from a fixed
+vocabulary, such as spelling a word with chemical element symbols or with
+state abbreviations.  A ``TokenSet`` compiles the vocabulary into a trie
+once; it can then parse single strings, or count the parsings of every
+word in a wordlist at once using NumPy.
+
+    >>> from puzzletools.enumerations import State
+    >>> states = TokenSet.for_field(State, 'abbr')
+    >>> states.parse('Mainland').first()
+    ['MA', 'IN', 'LA', 'ND']
+    >>> states.counts(['mainland', 'cowl', 'mode', 'coin'])
+    array([1, 0, 1, 1])
+
+Characters that are not letters are ignored (see ``TokenSet`` to change
+this), and case does not matter.
+'''
+
+import random
+
+class SymbolParse:
+    '''
+    All of the ways of writing a string as a sequence of symbols, stored as
+    a directed acyclic graph whose nodes are positions in the string and
+    whose edges are symbols.  The graph takes space linear in the length
+    of the string, even when the number of parsings is exponential, and
+    the parsings can be counted, enumerated lazily, sampled, or searched
+    for the best one.
+
+    Parsings are usually made with ``TokenSet.parse`` rather than by
+    calling the constructor directly.
+
+        >>> from puzzletools.enumerations import ChemicalElement
+        >>> p = TokenSet.for_field(ChemicalElement, 'symbol', weight='number').parse('Bison')
+        >>> p.count
+        2
+        >>> list(p)
+        [['Bi', 'S', 'O', 'N'], ['B', 'I', 'S', 'O', 'N']]
+        >>> p.best()
+        (114, ['Bi', 'S', 'O', 'N'])
+        >>> p.best(lambda sym: 1, maximize=False)
+        (4, ['Bi', 'S', 'O', 'N'])
+    '''
+
+    def __init__(self, s, tokens):
+        self.tokens = tokens
+        self.text = tokens.normalize(s)
+        trie = tokens.trie
+        n = len(self.text)
+        # ways[i] is the number of parsings of the first i letters
+        self.ways = [1]+[0]*n
+        # preds[j] lists the symbols (i, sym) that end at j and follow a
+        # parsable prefix, with the longest symbol first
+        self.preds = [[] for _ in range(n+1)]
+        for i in range(n):
+            if not self.ways[i]:
+                continue
+            node = trie
+            for j in range(i, n):
+                node = node.get(self.text[j])
+                if node is None:
+                    break
+                sym = node.get('')
+                if sym is not None:
+                    self.ways[j+1] += self.ways[i]
+                    self.preds[j+1].append((i, sym))
+        for p in self.preds:
+            p.sort()
+
+    @property
+    def count(self):
+        '''
+        The number of parsings.
+        '''
+        return self.ways[-1]
+
+    def __iter__(self):
+        '''
+        Yields each parsing as a list of symbols.  Parsings whose last
+        symbols are longer come first.
+        '''
+        n = len(self.text)
+        if not self.ways[n]:
+            return
+        if n==0:
+            yield []
+            return
+        # depth first search backwards from the end, without recursion so
+        # that long strings are not a problem
+        tokens = []
+        stack = [iter(self.preds[n])]
+        while stack:
+            for i, sym in stack[-1]:
+                tokens.append(sym)
+                if i==0:
+                    yield tokens[::-1]
+                    tokens.pop()
+                    continue
+                stack.append(iter(self.preds[i]))
+                break
+            else:
+                stack.pop()
+                if tokens:
+                    tokens.pop()
+
+    def first(self):
+        '''
+        Returns the first parsing yielded by ``__iter__``, or ``None`` if
+        there are no parsings.
+        '''
+        return next(iter(self), None)
+
+    def sample(self, rng=random):
+        '''
+        Returns a parsing chosen uniformly at random, or ``None`` if there
+        are no parsings.  ``rng`` is a ``random.Random`` instance (or the
+        ``random`` module).
+        '''
+        j = len(self.text)
+        if not self.ways[j]:
+            return None
+        tokens = []
+        while j>0:
+            r = rng.randrange(self.ways[j])
+            for i, sym in self.preds[j]:
+                r -= self.ways[i]
+                if r<0:
+                    break
+            tokens.append(sym)
+            j = i
+        return tokens[::-1]
+
+    def best(self, weight=None, maximize=True):
+        '''
+        Returns a pair ``(score, parsing)`` for the parsing with the highest
+        (or, if ``maximize`` is false, lowest) score, or ``None`` if there
+        are no parsings.  The score of a parsing is the sum of the weights
+        of its symbols.  ``weight`` is either a function or a mapping from
+        symbols to numbers.  By default, the weights of the ``TokenSet``
+        are used, or 1 for every symbol if it has none.
+        '''
+        if weight is None:
+            weight = self.tokens.weights
+        if weight is None:
+            weight = lambda sym: 1
+        if hasattr(weight, '__getitem__'):
+            weight = weight.__getitem__
+        n = len(self.text)
+        if not self.ways[n]:
+            return None
+        better = (lambda a, b: a>b) if maximize else (lambda a, b: a<b)
+        scores = [0]+[None]*n
+        choice = [None]*(n+1)
+        for j in range(1, n+1):
+            for i, sym in self.preds[j]:
+                score = scores[i]+weight(sym)
+                if scores[j] is None or better(score, scores[j]):
+                    scores[j] = score
+                    choice[j] = (i, sym)
+        tokens = []
+        j = n
+        while j>0:
+            j, sym = choice[j]
+            tokens.append(sym)
+        return (scores[n], tokens[::-1])
+
+class _CharCodes(dict):
+    # Characters that are not in any token are coded as 0
+    def __missing__(self, key):
+        return 0
+
+class TokenSet:
+    '''
+    A vocabulary of tokens that strings can be segmented into.
+
+    Arguments:
+    ``tokens`` - An iterable of the tokens.
+    ``weights`` - Optional.  A mapping from tokens to numbers, used as the
+    default scores for ``SymbolParse.best``.
+    ``keep`` - A function that returns true for the characters that are
+    significant.  Other characters are removed from both the tokens and
+    the strings being parsed.  The default is ``str.isalpha``; use
+    ``str.isalnum`` for tokens containing digits.
+    '''
+
+    # Window codes are looked up in a table rather than by binary search
+    # if the table would have at most this many bits of index
+    table_bits = 20
+
+    def __init__(self, tokens, weights=None, keep=str.isalpha):
+        self.keep = keep
+        self.weights = weights
+        self.trie = {}
+        self.lengths = set()
+        for token in tokens:
+            key = self.normalize(token)
+            if not key:
+                continue
+            node = self.trie
+            for c in key:
+                node = node.setdefault(c, {})
+            node.setdefault('', token)
+            self.lengths.add(len(key))
+        self._codes = None
+
+    @classmethod
+    def for_field(cls, enum, field, weight=None, keep=str.isalpha):
+        '''
+        Returns a ``TokenSet`` whose tokens are the values of ``field`` in
+        the enumeration ``enum``.  If ``weight`` is the name of a numeric
+        field, it gives the weights of the tokens.  The token set is built
+        once and kept until the items of the enumeration change.
+        '''
+        items = enum.items
+        key = ('tokens', field, weight, keep)
+        tokens = enum._indexes.get(key)
+        if tokens is None:
+            values = [getattr(item, field) for item in items]
+            weights = None
+            if weight is not None:
+                weights = {}
+                for item, v in zip(items, values):
+                    weights.setdefault(v, getattr(item, weight))
+            tokens = cls((v for v in values if isinstance(v, str)), weights, keep)
+            enum._indexes[key] = tokens
+        return tokens
+
+    def normalize(self, s):
+        '''
+        Removes the insignificant characters from ``s`` and converts it
+        to lowercase.
+        '''
+        keep = self.keep
+        if not ((keep is str.isalpha or keep is str.isalnum) and keep(s)):
+            s = ''.join(c for c in s if keep(c))
+        return s.lower()
+
+    def parse(self, s):
+        '''
+        Returns a ``SymbolParse`` containing all of the ways of writing
+        ``s`` as a sequence of tokens.
+        '''
+        return SymbolParse(s, self)
+
+    def count(self, s):
+        '''
+        Returns the number of ways of writing ``s`` as a sequence of tokens.
+        '''
+        return self.parse(s).count
+
+    def _compile_codes(self):
+        # Each character is given a code from 1 to len(chars), and each
+        # window of k characters a number with k digits in base 2**bits
+        import numpy as np
+        chars = sorted(set(_walk_keys(self.trie)))
+        bits = len(chars).bit_length()
+        if len(chars)>=0x100 or bits*max(self.lengths, default=0)>64:
+            return None
+        charcodes = _CharCodes((ord(c), i+1) for i, c in enumerate(chars))
+        windows = { k : [] for k in self.lengths }
+        for key in _walk_tokens(self.trie):
+            code = 0
+            for c in key:
+                code = code<<bits|charcodes[ord(c)]
+            windows[len(key)].append(code)
+        tables = {}
+        for k, codes in windows.items():
+            if bits*k<=self.table_bits:
+                table = np.zeros(1<<bits*k, dtype=bool)
+                table[codes] = True
+            else:
+                table = np.array(sorted(codes), dtype=np.uint64)
+            tables[k] = table
+        return (charcodes, bits, tables)
+
+    def counts(self, words, chunk_size=65536):
+        '''
+        Returns a NumPy array containing the number of ways of writing each
+        of ``words`` as a sequence of tokens.  All of the words are
+        processed together, one character position at a time, so this is
+        much faster than calling ``count`` on each word.  The counts are
+        64-bit integers, so they can overflow for very long strings.
+        '''
+        import numpy as np
+        words = [self.normalize(w) for w in words]
+        counts = np.zeros(len(words), dtype=np.int64)
+        if self._codes is None:
+            self._codes = self._compile_codes() or False
+        if not self._codes:
+            for i, w in enumerate(words):
+                counts[i] = self.count(w)
+            return counts
+        charcodes, bits, tables = self._codes
+        shift = np.uint64(bits)
+        maxlen = max(tables, default=0)
+        encoded = [w.translate(charcodes).encode('latin-1') for w in words]
+        for start in range(0, len(words), chunk_size):
+            chunk = encoded[start:start+chunk_size]
+            n = len(chunk)
+            lengths = np.array([len(w) for w in chunk], dtype=np.intp)
+            width = int(lengths.max(initial=0))
+            # padding with zeros, which are not part of any token
+            letters = np.frombuffer(b''.join(w.ljust(width+maxlen, b'\0') for w in chunk),
+                dtype=np.uint8).reshape(n, width+maxlen).astype(np.uint64)
+            matches = {}
+            for k, table in tables.items():
+                codes = np.zeros((n, width), dtype=np.uint64)
+                for t in range(k):
+                    codes = (codes<<shift)|letters[:,t:t+width]
+                if table.dtype==bool:
+                    matches[k] = table[codes]
+                else:
+                    idx = np.minimum(np.searchsorted(table, codes), len(table)-1)
+                    matches[k] = table[idx]==codes
+            ways = np.zeros((n, width+maxlen+1), dtype=np.int64)
+            ways[:,0] = 1
+            for i in range(width):
+                for k, match in matches.items():
+                    ways[:,i+k] += ways[:,i]*match[:,i]
+            counts[start:start+n] = ways[np.arange(n),lengths]
+        return counts
+
+    def parse_many(self, words, min_count=1):
+        '''
+        Yields a pair ``(word, parse)`` for each of ``words`` that can be
+        written as a sequence of tokens in at least ``min_count`` ways,
+        where ``parse`` is a ``SymbolParse``.  The words are screened with
+        ``counts`` first, so only the words that pass are parsed
+        individually.
+        '''
+        words = list(words)
+        for w, c in zip(words, self.counts(words)):
+            if c>=min_count:
+                yield (w, self.parse(w))
+
+def _walk_keys(trie):
+    for c, node in trie.items():
+        if c:
+            yield c
+            yield from _walk_keys(node)
+
+def _walk_tokens(trie, prefix=''):
+    for c, node in trie.items():
+        if c:
+            yield from _walk_tokens(node, prefix+c)
+        else:
+            yield prefix
@@ -10,10 +10,14 @@ Encoder and decoder for flag semaphore.
 """
 
 from puzzletools.code import Code, reverse_dict
-from puzzletools.datafiles import load_tsv
+from puzzletools.datafiles import lazy_class_attribute, load_tsv
 
 class Direction(Code):
 
+    @classmethod
+    def domain(cls):
+        return cls.dirs
+
     @classmethod
     def to_parent(cls,d):
         return cls.parent.dirs[cls.dirs.index(d)]
@@ -48,7 +52,9 @@ class DirectionCartesian(Direction):
 
 class StatefulSemaphoreEncoder:
 
-    alpha_to_semaphore = dict(load_tsv('semaphore.tsv'))
+    @lazy_class_attribute
+    def alpha_to_semaphore(cls):
+        return dict(load_tsv('semaphore.tsv'))
 
     def __init__(self,dirs=DirectionUnicode):
         self.mapping = { k : ''.join(map(dirs.from_parent,v)) for k,v in self.alpha_to_semaphore.items() }
@@ -77,8 +83,10 @@ class StatefulSemaphoreEncoder:
 
 class StatefulSemaphoreDecoder:
 
-    semaphore_to_alpha = { frozenset(b): a for a, b
-        in StatefulSemaphoreEncoder.alpha_to_semaphore.items() }
+    @lazy_class_attribute
+    def semaphore_to_alpha(cls):
+        return { frozenset(b): a for a, b
+            in StatefulSemaphoreEncoder.alpha_to_semaphore.items() }
 
     def __init__(self,dirs=DirectionPhonepad):
         self.mapping = { frozenset(dirs.from_parent(c) for c in k) : v for k,v in self.semaphore_to_alpha.items() }
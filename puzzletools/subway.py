@@ -6,8 +6,8 @@ Wikipedia.
 
 import json
 import typing
-from urllib.request import urlopen
 from puzzletools.enumeration import EnumerationMeta
+from puzzletools.fetch import urlopen
 
 _api_url='https://transit.land/api/v1/'
 
@@ -40,9 +40,10 @@ class SubwayMeta(type):
         super().__init__(name, bases, dct)
         if hasattr(cls, 'operator'):
             ann = { 'name': str, 'lines': typing.Sequence[str] }
-            classdict = { '__annotations__': ann }
+            classdict = { '__annotations__': ann, '__module__': cls.__module__,
+                '__qualname__': cls.__qualname__+'.stations' }
             cls.stations = EnumerationMeta(cls._enum_name(), (), classdict)
-            cls.stations.set_items_lazy(lambda: [cls.stations(*row) for row in cls._rows()])
+            cls.stations.set_items_lazy(lambda: [cls.stations(*row) for row in cls._rows()], cache=True)
 
     def _rows(cls):
         raw=cls.stations_raw()
@@ -3,7 +3,6 @@ Utilities for scraping data for html and csv files.  See the
 enumerations_web module for example uses.
 """
 
-from bs4 import BeautifulSoup
 import csv, io
 import typing
 
@@ -56,6 +55,7 @@ class HTMLTable:
 
     @staticmethod
     def from_data(data,tablenum=0):
+        from bs4 import BeautifulSoup
         if isinstance(data,bytes):
             data = data.decode()
         if not isinstance(data,BeautifulSoup):
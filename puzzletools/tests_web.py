@@ -11,7 +11,7 @@ from puzzletools.enumerations_web import _us_states
 from puzzletools.subway import *
 
 def canonicalize(item):
-    if isinstance(item,list):
+    if isinstance(item,(list,tuple)):
         return set(item)
     else:
         return item
@@ -0,0 +1,302 @@
+'''
+Indexes over wordlists, for answering the same kind of question about
+many words at once.
+
+A wordlist can be given as an iterable of words, or as a mapping from
+words to frequencies (such as the result of
+``puzzletools.wordlists.util.read_wordlist``), in which case more common
+words come first in the results.  Indexes can be saved to disk with
+``save`` and read back with ``load``, which is much faster than building
+them again for a large wordlist.
+'''
+
+import pickle, re
+
+def _ordered_words(wordlist):
+    if hasattr(wordlist, 'items'):
+        return [w for w, f in sorted(wordlist.items(), key=lambda x: -x[1])]
+    return list(wordlist)
+
+def cipher_pattern(word):
+    '''
+    Returns the canonical pattern of ``word``, in which the first distinct
+    character is replaced by ``A``, the second by ``B``, and so on.  Two
+    words are related by a substitution cipher (see
+    ``puzzletools.word_properties.is_cipher``) exactly when they have the
+    same pattern.
+
+        >>> cipher_pattern('oceanfront')
+        'ABCDEFGAEH'
+        >>> cipher_pattern('that')
+        'ABCA'
+    '''
+    codes = {}
+    return ''.join([codes.setdefault(c, chr(0x41+len(codes))) for c in word])
+
+class _Index:
+
+    def save(self, filename):
+        '''
+        Saves this index to a file.
+        '''
+        with open(filename, 'wb') as f:
+            pickle.dump(self, f, pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, filename):
+        '''
+        Loads an index that was saved with ``save``.
+        '''
+        with open(filename, 'rb') as f:
+            index = pickle.load(f)
+        if not isinstance(index, cls):
+            raise TypeError('%s does not contain a %s' % (filename, cls.__name__))
+        return index
+
+class CryptogramIndex(_Index):
+    '''
+    A wordlist indexed by cipher pattern, for solving cryptograms.
+
+        >>> index = CryptogramIndex(['THE', 'AND', 'CAT', 'HAT', 'SEE', 'TEA', 'EAT', 'ATE'])
+        >>> index['XYZ'][:4]
+        ['THE', 'AND', 'CAT', 'HAT']
+        >>> index.matches_many(['QRR', 'QQQ'])
+        [['SEE'], []]
+        >>> index['QRR'].remove('SEE')
+        >>> index['QRR']
+        ['SEE']
+        >>> list(index.solve('XYZ ZQX'))
+        [('THE', 'EAT'), ('EAT', 'THE')]
+        >>> list(index.solve('XYZ ZQX', { 'Y': 'A' }))
+        [('EAT', 'THE')]
+    '''
+
+    def __init__(self, wordlist):
+        self.patterns = {}
+        for w in _ordered_words(wordlist):
+            self.patterns.setdefault(cipher_pattern(w), []).append(w)
+
+    def __getitem__(self, word):
+        '''
+        Returns a list of the words that are related to ``word`` by a
+        substitution cipher.
+        '''
+        return list(self.patterns.get(cipher_pattern(word), ()))
+
+    def __len__(self):
+        return sum(len(v) for v in self.patterns.values())
+
+    def matches_many(self, words):
+        '''
+        Returns a list containing the matches for each of ``words``.
+        '''
+        get = self.patterns.get
+        return [list(get(cipher_pattern(w), ())) for w in words]
+
+    def solve(self, cipherwords, mapping=None):
+        '''
+        Solves a cryptogram consisting of several words, which must all be
+        in the wordlist.  ``cipherwords`` is either a list of words or a
+        string of words separated by spaces.  ``mapping`` is an optional
+        dictionary giving some of the letters of the key, mapping
+        ciphertext letters to plaintext letters.
+
+        Yields each solution as a tuple of plaintext words.  The same
+        ciphertext letter always stands for the same plaintext letter,
+        and different ciphertext letters stand for different plaintext
+        letters, across all of the words.  The search fills in the word
+        with the fewest remaining candidates first, and after each choice
+        removes the candidates that are no longer consistent from the
+        other words, so it backtracks as soon as some word has none left.
+        '''
+        if isinstance(cipherwords, str):
+            cipherwords = cipherwords.split()
+        mapping = dict(mapping or {})
+        reverse = { p : c for c, p in mapping.items() }
+        if len(reverse)!=len(mapping):
+            return
+        candidates = {}
+        for i, w in enumerate(cipherwords):
+            cands = [p for p in self[w] if _consistent(w, p, mapping, reverse)]
+            if not cands:
+                return
+            candidates[i] = cands
+        solution = [None]*len(cipherwords)
+        yield from _search(cipherwords, candidates, mapping, reverse, solution)
+
+def _consistent(cipher, plain, mapping, reverse):
+    for c, p in zip(cipher, plain):
+        q = mapping.get(c)
+        if q is None:
+            if p in reverse:
+                return False
+        elif q!=p:
+            return False
+    return True
+
+def _search(cipherwords, candidates, mapping, reverse, solution):
+    if not candidates:
+        yield tuple(solution)
+        return
+    k = min(candidates, key=lambda i: len(candidates[i]))
+    cipher = cipherwords[k]
+    rest = { i : v for i, v in candidates.items() if i!=k }
+    for plain in candidates[k]:
+        added = []
+        for c, p in zip(cipher, plain):
+            if c not in mapping:
+                mapping[c] = p
+                reverse[p] = c
+                added.append(c)
+        pruned = {}
+        for i, cands in rest.items():
+            if added:
+                cands = [w for w in cands if _consistent(cipherwords[i], w, mapping, reverse)]
+                if not cands:
+                    break
+            pruned[i] = cands
+        else:
+            solution[k] = plain
+            yield from _search(cipherwords, pruned, mapping, reverse, solution)
+        for c in added:
+            del reverse[mapping.pop(c)]
+
+_nonletter_re = re.compile('[^A-Z]+')
+
+def _letters(word):
+    return _nonletter_re.sub('', word.upper())
+
+def anagram_signature(word):
+    '''
+    Returns the letters of ``word`` in alphabetical order, ignoring case and
+    anything that is not a letter.  Two words are anagrams exactly when
+    they have the same signature.
+
+        >>> anagram_signature('Dormitory')
+        'DIMOORRTY'
+    '''
+    return ''.join(sorted(_letters(word)))
+
+def _letter_counts(letters):
+    import numpy as np
+    counts = np.zeros(26, dtype=np.int64)
+    for c in letters:
+        counts[ord(c)-0x41] += 1
+    return counts
+
+class AnagramIndex(_Index):
+    '''
+    A wordlist indexed by the letters in each word.  Only the letters A-Z
+    are considered, and case is ignored.  Exact anagrams are looked up by
+    signature; the other queries compare the target against the letter
+    counts of every word at once, using a NumPy matrix with one row per
+    word and one column per letter.
+
+        >>> index = AnagramIndex(['DIRTY ROOM', 'DORMITORY', 'ROOM', 'MOOD', 'TIMID', 'DORM'])
+        >>> index.anagrams('dormitory')
+        ['DIRTY ROOM', 'DORMITORY']
+        >>> index.sub_anagrams('dormitory')
+        ['DIRTY ROOM', 'DORMITORY', 'ROOM', 'MOOD', 'DORM']
+        >>> index.containing('MOD')
+        ['DIRTY ROOM', 'DORMITORY', 'MOOD', 'DORM']
+        >>> index.sub_anagrams_many(['ROMDO', 'DIMIT'])
+        [['ROOM', 'MOOD', 'DORM'], ['TIMID']]
+    '''
+
+    def __init__(self, wordlist):
+        import numpy as np
+        self.words = _ordered_words(wordlist)
+        self.signatures = {}
+        letters = [_letters(w) for w in self.words]
+        for w, l in zip(self.words, letters):
+            self.signatures.setdefault(''.join(sorted(l)), []).append(w)
+        letters = [l.encode('ascii') for l in letters]
+        lengths = np.array([len(l) for l in letters], dtype=np.intp)
+        codes = np.frombuffer(b''.join(letters), dtype=np.uint8).astype(np.intp)-0x41
+        rows = np.repeat(np.arange(len(letters)), lengths)
+        counts = np.bincount(rows*26+codes, minlength=26*len(letters)).reshape(len(letters), 26)
+        # letter counts above 255 are clipped
+        self.counts = np.minimum(counts, 0xff).astype(np.uint8)
+        self.lengths = lengths
+        # bit i is set if the word contains the i-th letter of the alphabet
+        self.letter_bits = ((counts>0).astype(np.uint32)<<np.arange(26, dtype=np.uint32)).sum(axis=1, dtype=np.uint32)
+
+    def __len__(self):
+        return len(self.words)
+
+    def _target(self, letters):
+        import numpy as np
+        counts = _letter_counts(_letters(letters))
+        bits = int(sum(1<<i for i in range(26) if counts[i]))
+        return (counts, np.uint32(bits))
+
+    def _select(self, mask):
+        return [self.words[i] for i in mask.nonzero()[0]]
+
+    def anagrams(self, letters):
+        '''
+        Returns the words that use exactly the letters of ``letters``.
+        '''
+        return list(self.signatures.get(anagram_signature(letters), []))
+
+    def sub_anagram_mask(self, letters):
+        '''
+        Returns a boolean array that is true for the words that can be
+        formed from a subset of the letters of ``letters``.
+        '''
+        counts, bits = self._target(letters)
+        mask = (self.letter_bits & ~bits)==0
+        rows = mask.nonzero()[0]
+        for i in counts.nonzero()[0]:
+            rows = rows[self.counts[rows,i]<=counts[i]]
+        mask[:] = False
+        mask[rows] = True
+        return mask
+
+    def containing_mask(self, letters):
+        '''
+        Returns a boolean array that is true for the words that contain all
+        of the letters of ``letters`` (counted with multiplicity).
+        '''
+        counts, bits = self._target(letters)
+        mask = (self.letter_bits & bits)==bits
+        rows = mask.nonzero()[0]
+        for i in (counts>1).nonzero()[0]:
+            rows = rows[self.counts[rows,i]>=counts[i]]
+        mask[:] = False
+        mask[rows] = True
+        return mask
+
+    def sub_anagrams(self, letters, min_length=1):
+        '''
+        Returns the words that can be formed from a subset of the letters of
+        ``letters``, and that have at least ``min_length`` letters.
+        '''
+        return self._select(self.sub_anagram_mask(letters) & (self.lengths>=min_length))
+
+    def containing(self, letters):
+        '''
+        Returns the words that contain all of the letters of ``letters``.
+        '''
+        return self._select(self.containing_mask(letters))
+
+    def anagrams_many(self, targets):
+        '''
+        Returns a list containing the result of ``anagrams`` for each of
+        ``targets``.
+        '''
+        return [self.anagrams(t) for t in targets]
+
+    def sub_anagrams_many(self, targets, min_length=1):
+        '''
+        Returns a list containing the result of ``sub_anagrams`` for each of
+        ``targets``.
+        '''
+        return [self.sub_anagrams(t, min_length) for t in targets]
+
+    def containing_many(self, targets):
+        '''
+        Returns a list containing the result of ``containing`` for each of
+        ``targets``.
+        '''
+        return [self.containing(t) for t in targets]
@@ -33,3 +33,180 @@ def is_sub_anagram(w1,w2):
         True
     '''
     return all(w2.count(c)>=w1.count(c) for c in set(w1))
+
+def is_letter_bank(w1,w2):
+    '''
+    Returns true if ``w1`` uses exactly the same set of letters as ``w2``,
+    each as many times as desired.
+
+        >>> is_letter_bank('tattoo','oat')
+        True
+    '''
+    return set(w1)==set(w2)
+
+def is_transposal(w1,w2):
+    '''
+    Returns true if ``w1`` is a rearrangement of the letters of ``w2``
+    other than ``w2`` itself.
+
+        >>> is_transposal('listen','silent')
+        True
+        >>> is_transposal('listen','listen')
+        False
+    '''
+    return w1!=w2 and sorted(w1)==sorted(w2)
+
+def contains_pattern(w,pattern):
+    '''
+    Returns true if ``w`` contains ``pattern`` as a contiguous substring,
+    where ``?`` in ``pattern`` matches any character.
+
+        >>> contains_pattern('crossword','o?s')
+        True
+    '''
+    m = len(pattern)
+    return any(all(p=='?' or p==c for p,c in zip(pattern,w[i:i+m])) for i in range(len(w)-m+1))
+
+def letter_sum(w):
+    '''
+    Returns the sum of the positions in the alphabet of the letters of
+    ``w`` (A=1, B=2, ..., Z=26).  Case and non-letters are ignored.
+
+        >>> letter_sum('Puzzle')
+        106
+    '''
+    return sum(ord(c)-0x40 for c in w.upper() if 'A'<=c<='Z')
+
+class WordMatrix:
+    '''
+    A wordlist encoded once as a matrix with one row per word, padded with
+    zeros, so that a property can be tested for every word at once.  The
+    methods named after the functions in this module return a boolean
+    NumPy array that is true for the words ``w`` for which the function
+    returns true when called as ``f(w, target)``.  Masks can be combined
+    with ``&`` and ``|``, and ``select`` turns a mask back into words.
+
+        >>> m = WordMatrix(['asburypark', 'nineteenth', 'silent', 'tinsel', 'listen', 'tattoo'])
+        >>> m.select(m.is_cipher('oceanfront'))
+        ['asburypark']
+        >>> m.select(m.is_transposal('listen') & m.contains_pattern('n?e'))
+        ['tinsel']
+        >>> m.select(m.is_sub_anagram('entails') | m.is_letter_bank('oat'))
+        ['silent', 'tinsel', 'listen', 'tattoo']
+
+    The matrix has type ``uint8`` if every character is in Latin-1, and
+    holds Unicode code points otherwise.
+    '''
+
+    def __init__(self,words):
+        import numpy as np
+        self.words = list(words)
+        self.lengths = np.array([len(w) for w in self.words],dtype=np.intp)
+        width = int(self.lengths.max(initial=0))
+        try:
+            data = b''.join(w.encode('latin-1').ljust(width,b'\0') for w in self.words)
+            dtype = np.uint8
+        except UnicodeEncodeError:
+            data = b''.join(w.ljust(width,'\0').encode('utf-32-le') for w in self.words)
+            dtype = np.uint32
+        self.matrix = np.frombuffer(data,dtype=dtype).reshape(len(self.words),width)
+
+    def __len__(self):
+        return len(self.words)
+
+    def select(self,mask):
+        '''
+        Returns the words for which ``mask`` is true.
+        '''
+        return [self.words[i] for i in mask.nonzero()[0]]
+
+    def _codes(self,s):
+        import numpy as np
+        return np.array([ord(c) for c in s],dtype=np.uint32)
+
+    def _only(self,chars):
+        # true for the words made up only of ``chars``
+        import numpy as np
+        codes = self._codes(chars+'\0')
+        if self.matrix.dtype==np.uint8:
+            allowed = np.zeros(0x100,dtype=bool)
+            allowed[codes[codes<0x100]] = True
+            return allowed[self.matrix].all(axis=1)
+        return np.isin(self.matrix,codes).all(axis=1)
+
+    def _count_filter(self,mask,target,test):
+        # keeps the words in ``mask`` for which ``test(count in word,
+        # count in target)`` holds for every character of ``target``
+        rows = mask.nonzero()[0]
+        for c in set(target):
+            count = (self.matrix[rows]==ord(c)).sum(axis=1)
+            rows = rows[test(count,target.count(c))]
+        mask[:] = False
+        mask[rows] = True
+        return mask
+
+    def is_cipher(self,target):
+        n = len(target)
+        mask = self.lengths==n
+        if n>self.matrix.shape[1]:
+            return mask
+        m = self.matrix[:,:n]
+        first = {}
+        for i,c in enumerate(target):
+            j = first.setdefault(c,i)
+            if j!=i:
+                mask &= m[:,i]==m[:,j]
+        firsts = sorted(first.values())
+        for a,i in enumerate(firsts):
+            for j in firsts[a+1:]:
+                mask &= m[:,i]!=m[:,j]
+        return mask
+
+    def is_sub_anagram(self,target):
+        return self._count_filter(self._only(target),target,lambda a,b: a<=b)
+
+    def is_transposal(self,target):
+        mask = (self.lengths==len(target)) & self.is_sub_anagram(target)
+        if len(target)<=self.matrix.shape[1]:
+            same = (self.matrix[:,:len(target)]==self._codes(target)).all(axis=1)
+            mask &= ~same
+        return mask
+
+    def is_letter_bank(self,target):
+        return self._count_filter(self._only(target),target,lambda a,b: a>0)
+
+    def contains_pattern(self,pattern):
+        import numpy as np
+        m = len(pattern)
+        width = self.matrix.shape[1]
+        mask = np.zeros(len(self.words),dtype=bool)
+        for start in range(width-m+1):
+            match = self.lengths>=start+m
+            for k,c in enumerate(pattern):
+                if c!='?':
+                    match &= self.matrix[:,start+k]==ord(c)
+            mask |= match
+        if m==0:
+            mask[:] = True
+        return mask
+
+    def letter_sums(self):
+        '''
+        Returns an array containing the ``letter_sum`` of each word.
+        '''
+        import numpy as np
+        values = np.zeros(0x100,dtype=np.uint8)
+        values[0x41:0x5b] = values[0x61:0x7b] = np.arange(1,27)
+        m = self.matrix
+        if m.dtype!=np.uint8:
+            m = np.where(m<0x100,m,0).astype(np.uint8)
+        return values[m].sum(axis=1,dtype=np.int64)
+
+    def has_letter_sum(self,target):
+        '''
+        Returns a boolean array that is true for the words whose
+        ``letter_sum`` is ``target``, which can be a number or a word.
+        '''
+        if isinstance(target,str):
+            target = letter_sum(target)
+        return self.letter_sums()==target
@@ -0,0 +1,203 @@
+'''
+A compact binary wordlist format that is opened with ``mmap``, so that
+opening a list takes constant time and several processes using the same
+list share one copy of it in the page cache.
+
+A compiled wordlist consists of a header, an array of the offsets of the
+entries, an array of their frequencies, and the UTF-8 encoded entries
+themselves, sorted so that they can be looked up by binary search.
+
+    >>> import os, tempfile
+    >>> tmp = tempfile.TemporaryDirectory()
+    >>> path = os.path.join(tmp.name, 'words.wl')
+    >>> write_compiled(path, [('CAT', 10), ('ACT', 3), ('DOG', 7), ('CART', 5)])
+    >>> wl = CompiledWordlist(path)
+    >>> list(wl)
+    ['ACT', 'CART', 'CAT', 'DOG']
+    >>> wl['CAT'], 'COW' in wl
+    (10, False)
+    >>> wl.prefixed('CA')
+    ['CART', 'CAT']
+    >>> wl.freqs
+    array([ 3,  5, 10,  7])
+    >>> [wl.word(i) for i in wl.by_frequency()[:2]]
+    ['CAT', 'DOG']
+    >>> wl.close()
+    >>> tmp.cleanup()
+
+A compiled wordlist is a read-only mapping from entries to frequencies,
+so it can be used anywhere a wordlist dictionary is accepted.
+
+Example usage, to compile a list written by ``WordlistGenerator.write``:
+python -m puzzletools.wordlists.compiled names_all.txt names_all.wl
+'''
+
+from collections.abc import Mapping
+import argparse, mmap, os, struct
+
+_magic = b'PZWL'
+_version = 1
+# magic, version, number of entries, size of the entries in bytes
+_header = struct.Struct('<4sIQQ')
+
+def write_compiled(filename, entries):
+    '''
+    Writes a compiled wordlist.  ``entries`` is an iterable of
+    ``(word, frequency)`` pairs or a mapping from words to frequencies.
+    If a word appears more than once, the first frequency is used.  The
+    file is written atomically.
+    '''
+    import numpy as np
+    if hasattr(entries, 'items'):
+        entries = entries.items()
+    table = {}
+    for word, freq in entries:
+        table.setdefault(word.encode('utf-8'), int(freq))
+    keys = sorted(table)
+    offsets = np.zeros(len(keys)+1, dtype='<u8')
+    np.cumsum([len(k) for k in keys], out=offsets[1:])
+    freqs = np.array([table[k] for k in keys], dtype='<i8')
+    tmp = '%s.%d.tmp' % (filename, os.getpid())
+    with open(tmp, 'wb') as f:
+        f.write(_header.pack(_magic, _version, len(keys), int(offsets[-1])))
+        f.write(offsets.tobytes())
+        f.write(freqs.tobytes())
+        for k in keys:
+            f.write(k)
+    os.replace(tmp, filename)
+
+class CompiledWordlist(Mapping):
+    '''
+    A compiled wordlist, opened read-only with ``mmap``.  Entries are
+    decoded only when they are accessed.
+
+    Attributes:
+    ``offsets`` - NumPy array; entry ``i`` occupies bytes
+    ``offsets[i]:offsets[i+1]`` of ``data``.
+    ``freqs`` - NumPy array of the frequencies, in entry order.
+    ``data`` - A ``memoryview`` of the UTF-8 encoded entries.
+    These share memory with the file, so they must not be used after the
+    wordlist is closed.
+    '''
+
+    def __init__(self, filename):
+        import numpy as np
+        with open(filename, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, size = _header.unpack_from(self._mmap)
+        if magic!=_magic:
+            self._mmap.close()
+            raise ValueError('%s is not a compiled wordlist' % filename)
+        if version!=_version:
+            self._mmap.close()
+            raise ValueError('%s has unsupported version %d' % (filename, version))
+        pos = _header.size
+        self.offsets = np.frombuffer(self._mmap, dtype='<u8', count=count+1, offset=pos)
+        pos += 8*(count+1)
+        self.freqs = np.frombuffer(self._mmap, dtype='<i8', count=count, offset=pos)
+        pos += 8*count
+        self.data = memoryview(self._mmap)[pos:pos+size]
+        self._count = count
+
+    def close(self):
+        '''
+        Closes the file.
+        '''
+        self.data.release()
+        del self.offsets, self.freqs, self.data
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def _key(self, i):
+        return bytes(self.data[self.offsets[i]:self.offsets[i+1]])
+
+    def word(self, i):
+        '''
+        Returns the ``i``-th entry in sorted order.
+        '''
+        if i<0:
+            i += self._count
+        if not 0<=i<self._count:
+            raise IndexError('entry index out of range')
+        return self._key(i).decode('utf-8')
+
+    def _bisect(self, key):
+        lo, hi = 0, self._count
+        while lo<hi:
+            mid = (lo+hi)//2
+            if self._key(mid)<key:
+                lo = mid+1
+            else:
+                hi = mid
+        return lo
+
+    def index(self, word):
+        '''
+        Returns the position of ``word`` in sorted order, or raises
+        ``KeyError`` if it is not in the list.
+        '''
+        key = word.encode('utf-8')
+        i = self._bisect(key)
+        if i<self._count and self._key(i)==key:
+            return i
+        raise KeyError(word)
+
+    def __getitem__(self, word):
+        return int(self.freqs[self.index(word)])
+
+    def __contains__(self, word):
+        try:
+            self.index(word)
+        except (KeyError, AttributeError):
+            return False
+        return True
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self._key(i).decode('utf-8')
+
+    def prefix_range(self, prefix):
+        '''
+        Returns a pair ``(start, stop)`` such that the entries starting with
+        ``prefix`` are the ones at positions ``start`` to ``stop-1``.
+        '''
+        key = prefix.encode('utf-8')
+        start = self._bisect(key)
+        lo, hi = start, self._count
+        while lo<hi:
+            mid = (lo+hi)//2
+            if self._key(mid).startswith(key):
+                lo = mid+1
+            else:
+                hi = mid
+        return (start, lo)
+
+    def prefixed(self, prefix):
+        '''
+        Returns the entries starting with ``prefix``, in sorted order.
+        '''
+        return [self.word(i) for i in range(*self.prefix_range(prefix))]
+
+    def by_frequency(self):
+        '''
+        Returns a NumPy array of entry positions, from the most frequent
+        entry to the least frequent.
+        '''
+        import numpy as np
+        return np.argsort(-self.freqs, kind='stable')
+
+if __name__=='__main__':
+    from puzzletools.wordlists.util import read_wordlist
+    parser = argparse.ArgumentParser()
+    parser.add_argument('input',help='wordlist in the format written by WordlistGenerator.write')
+    parser.add_argument('output',help='compiled wordlist to write')
+    args = parser.parse_args()
+    write_compiled(args.output, read_wordlist(args.input))
@@ -1,41 +1,125 @@
 '''
 Generates lists of common American first names, using the Social Security
 Administration's baby name data
+
+The data is one file per year, inside a zip archive.  The yearly files are
+read in parallel by a pool of processes.
+
+    >>> import os, tempfile, zipfile
+    >>> tmp = tempfile.TemporaryDirectory()
+    >>> path = os.path.join(tmp.name, 'names.zip')
+    >>> with zipfile.ZipFile(path, 'w') as z:
+    ...     z.writestr('yob2000.txt', 'Mary,F,100\\r\\nJohn,M,90\\r\\nJo-Ann,F,5\\r\\n')
+    ...     z.writestr('yob2001.txt', 'Mary,F,80\\r\\nJohn,F,3\\r\\nJohn,M,70\\r\\n')
+    >>> both, female, male = read_names(path, processes=1)
+    >>> female.make_list()
+    [(180, 'MARY'), (5, 'JO ANN'), (3, 'JOHN')]
+    >>> both.make_list()
+    [(180, 'MARY'), (163, 'JOHN'), (5, 'JO ANN')]
+    >>> read_names(path, processes=2)[2].make_list()
+    [(160, 'JOHN')]
+    >>> tmp.cleanup()
 '''
 
 from zipfile import ZipFile
 from urllib.request import urlopen
-from io import BytesIO, TextIOWrapper
+from io import TextIOWrapper
+from concurrent.futures import ProcessPoolExecutor
 from puzzletools.wordlists.util import WordlistGenerator
-import argparse, os
+import argparse, os, shutil, tempfile
+
+names_url = 'https://www.ssa.gov/oact/babynames/names.zip'
 
-def load():
-    req=urlopen('https://www.ssa.gov/oact/babynames/names.zip')
-    return ZipFile(BytesIO(req.read()))
+def _download(source,f):
+    with urlopen(source) as req:
+        shutil.copyfileobj(req,f)
 
-def read_names(z):
+def fetch(source=names_url):
+    '''
+    Returns the path of a local copy of the data.  If ``source`` is a URL,
+    the archive is streamed to a temporary file, which the caller should
+    delete; otherwise ``source`` is returned unchanged.
+    '''
+    if '://' not in source:
+        return source
+    with tempfile.NamedTemporaryFile(suffix='.zip',delete=False) as f:
+        _download(source,f)
+    return f.name
+
+def load(source=names_url):
+    '''
+    Opens the data as a ``ZipFile``.  ``source`` is a local path or a URL;
+    a downloaded archive is streamed to an anonymous temporary file.
+    '''
+    if '://' not in source:
+        return ZipFile(source)
+    f = tempfile.TemporaryFile()
+    _download(source,f)
+    return ZipFile(f)
+
+def _read_members(z,members):
+    if isinstance(z,str):
+        with ZipFile(z) as zf:
+            return _read_members(zf,members)
     both = WordlistGenerator()
     female = WordlistGenerator()
     male = WordlistGenerator()
-    for n in z.namelist():
-        if n.endswith('.txt'):
-            with z.open(n,'r') as f:
-                for l in TextIOWrapper(f):
-                    name,gen,num=l.split(',')
-                    num=int(num)
-                    both.add(name,num)
-                    if gen=='F':
-                        female.add(name,num)
-                    if gen=='M':
-                        male.add(name,num)
+    for n in members:
+        with z.open(n,'r') as f:
+            for l in TextIOWrapper(f):
+                name,gen,num=l.split(',')
+                num=int(num)
+                both.add(name,num)
+                if gen=='F':
+                    female.add(name,num)
+                if gen=='M':
+                    male.add(name,num)
     return (both,female,male)
 
+def read_names(z,processes=None):
+    '''
+    Reads the data, and returns a tuple of three ``WordlistGenerator``
+    objects, for all names, female names, and male names.  ``z`` is either
+    a ``ZipFile`` or the path to the archive.  ``processes`` is the number
+    of worker processes to use (by default, the number of CPUs).  If it is
+    1, or if ``z`` is a ``ZipFile`` that was not opened from a named file,
+    everything is done in this process.
+    '''
+    if isinstance(z,str):
+        path = z
+        with ZipFile(path) as zf:
+            members = [n for n in zf.namelist() if n.endswith('.txt')]
+    else:
+        path = z.filename if isinstance(z.filename,str) else None
+        members = [n for n in z.namelist() if n.endswith('.txt')]
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = max(1,min(processes,len(members)))
+    if processes==1 or path is None:
+        parts = [_read_members(z,members)]
+    else:
+        with ProcessPoolExecutor(processes) as ex:
+            parts = list(ex.map(_read_members,[path]*processes,
+                [members[i::processes] for i in range(processes)]))
+    result = (WordlistGenerator(),WordlistGenerator(),WordlistGenerator())
+    for part in parts:
+        for total,gen in zip(result,part):
+            total.merge(gen)
+    return result
+
 if __name__=='__main__':
     parser = argparse.ArgumentParser()
     parser.add_argument('--outdir',help='directory to which the lists should be saved (default is the current directory)',default='.')
+    parser.add_argument('--source',help='path or URL of names.zip (default is to download it from the SSA)',default=names_url)
+    parser.add_argument('--processes',help='number of worker processes (default is the number of CPUs)',type=int)
     args=parser.parse_args()
     path=args.outdir+os.sep
-    b,f,m=read_names(load())
+    source=fetch(args.source)
+    try:
+        b,f,m=read_names(source,args.processes)
+    finally:
+        if source!=args.source:
+            os.remove(source)
     kwa={'cutoff':200,'eliminate_duplicate_slugs':False}
     b.write(path+'names_all.txt',**kwa)
     f.write(path+'names_female.txt',**kwa)
@@ -1,29 +1,78 @@
 from collections import defaultdict
+from functools import lru_cache
 from unidecode import unidecode
 import re
 
-_sep_re = re.compile(r'[/_\-]+')
-_alnumspace_re = re.compile(r'[^0-9A-Za-z ]')
-_spaces_re = re.compile(r'\s+')
+# '&' becomes 'AND', and separators become spaces
+_punct_table = str.maketrans({ '&': ' AND ', '/': ' ', '_': ' ', '-': ' ' })
+_nonalnum_re = re.compile(r'[^0-9A-Z ]+')
+_nonalnum_lines_re = re.compile(r'[^0-9A-Z \n]+')
+_spaces_re = re.compile(r' {2,}')
+_line_spaces_re = re.compile(r' ?\n ?')
 _nonalpha_re = re.compile(r'[^A-Z]')
+_nonascii_re = re.compile(r'[^\x00-\x7f]')
 
+def _to_ascii(s):
+    # unidecode leaves ASCII strings unchanged, so they can skip it
+    return unidecode(s) if _nonascii_re.search(s) else s
+
+@lru_cache(maxsize=1<<16)
 def normalize_alnum(s):
-    s = unidecode(s).upper()
-    s = s.replace('&',' AND ')
-    s = _sep_re.sub(' ',s)
-    s = _alnumspace_re.sub('',s)
-    s = _spaces_re.sub(' ',s).strip()
-    return s
+    '''
+    Converts ``s`` to uppercase ASCII letters, digits, and single spaces.
+
+        >>> normalize_alnum('Café au lait & Crème-Brûlée!')
+        'CAFE AU LAIT AND CREME BRULEE'
+
+    Results are cached, since the same names tend to be added many times.
+    '''
+    s = _to_ascii(s).upper().translate(_punct_table)
+    return ' '.join(_nonalnum_re.sub('',s).split())
+
+def normalize_many(strings):
+    '''
+    Returns a list containing ``normalize_alnum(s)`` for each of
+    ``strings``.  Each distinct string is only converted once, and the
+    conversion is done with a few passes over all of the strings joined
+    together.  This is somewhat faster than ``normalize_alnum`` for a batch
+    of strings that have not been seen before; when the same strings recur,
+    as they do when building a wordlist, the cache of ``normalize_alnum``
+    is faster.
+
+        >>> normalize_many(['R&B', 'hip-hop', 'R&B', 'Mot\\u00f6rhead'])
+        ['R AND B', 'HIP HOP', 'R AND B', 'MOTORHEAD']
+    '''
+    strings = list(strings)
+    distinct = list(dict.fromkeys(strings))
+    # newlines separate the strings; normalize_alnum would remove them anyway
+    s = '\n'.join(_to_ascii(t).replace('\n','') for t in distinct)
+    s = _nonalnum_lines_re.sub('',s.upper().translate(_punct_table))
+    s = _line_spaces_re.sub('\n',_spaces_re.sub(' ',s)).strip(' ')
+    table = dict(zip(distinct,s.split('\n')))
+    return [table[t] for t in strings]
 
 class WordlistGenerator:
-    def __init__(self):
-        self.words = defaultdict(lambda : 0)
+    def __init__(self,normalize=normalize_alnum):
+        '''
+        ``normalize`` is the function used to normalize names before they
+        are added.  Generators can be pickled (for example, to send them
+        between processes) if ``normalize`` is a module-level function.
+        '''
+        self.words = defaultdict(int)
+        self.normalize = normalize
 
     def add(self,name,freq,func=lambda x,y: x+y):
-        name = normalize_alnum(name)
+        name = self.normalize(name)
         freq = int(freq)
         self.words[name]=func(self.words[name],freq)
 
+    def merge(self,other,func=lambda x,y: x+y):
+        '''
+        Adds all of the entries of another generator to this one.
+        '''
+        for name,freq in other.words.items():
+            self.words[name]=func(self.words[name],freq)
+
     def make_list(self,cutoff=0,eliminate_duplicate_slugs=True):
         l = [(v,k) for k,v in self.words.items() if v>=cutoff]
         l.sort(reverse=True)
@@ -45,3 +94,32 @@ class WordlistGenerator:
         with open(filename,'w') as f:
             for v,k in l:
                 print("%s,%d"%(k,v),file=f)
+
+    def write_compiled(self,filename,cutoff=0,eliminate_duplicate_slugs=True):
+        '''
+        Writes the list in the binary format of
+        ``puzzletools.wordlists.compiled``, which can be opened without
+        parsing it.
+        '''
+        from puzzletools.wordlists.compiled import write_compiled
+        l = self.make_list(cutoff,eliminate_duplicate_slugs)
+        write_compiled(filename,((k,v) for v,k in l))
+
+def read_wordlist(filename):
+    '''
+    Reads a wordlist in the format written by ``WordlistGenerator.write``,
+    and returns a dictionary mapping each entry to its frequency.  Entries
+    without a frequency are given frequency 1.
+    '''
+    words = {}
+    with open(filename) as f:
+        for l in f:
+            l = l.rstrip('\n')
+            if not l:
+                continue
+            word, sep, freq = l.rpartition(',')
+            if sep and freq.isdigit():
+                words[word] = int(freq)
+            else:
+                words[l] = 1
+    return words
@@ -12,5 +12,6 @@ setup(
         'cattrs',
         'beautifulsoup4[lxml]',
         'unidecode',
+        'numpy',
     ],
 )